@@ -18,42 +18,52 @@ import json
 import shutil
 import platform
 import hashlib
-import ctypes
-import string
+import mmap
 import unicodedata
 import time
-import socket
+import random
 import signal
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Tuple
-from functools import wraps
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Tuple, Iterator, Set, Callable, Union
+from functools import wraps, lru_cache
 
 import typer
 from typer import Option, Argument
-from rich.console import Console
+from rich.console import Console, Group
 from rich.panel import Panel
 from rich.table import Table
 from rich.prompt import Prompt, Confirm
-from rich.progress import (
-    Progress,
-    BarColumn,
-    TextColumn,
-    TimeRemainingColumn,
-    SpinnerColumn,
-    TransferSpeedColumn,
-)
-from rich.align import Align
-from rich.columns import Columns
 from rich import box
-import psutil
-import yt_dlp
-
-app = typer.Typer(add_completion=False, no_args_is_help=False)
+# yt_dlp (el import más costoso), psutil, rich.progress, Align, Columns, socket y ctypes se
+# importan en las funciones que los usan: --help, about o config arrancan sin cargarlos
+if TYPE_CHECKING:
+    from rich.progress import Progress  # solo para anotaciones
+
+try:
+    import orjson  # Parser JSON en C/Rust, opcional
+except ImportError:
+    orjson = None
+
+try:
+    from blake3 import blake3 as _blake3  # Hash SIMD multihilo, opcional
+except ImportError:
+    _blake3 = None
+
+# Los comandos ya imprimen sus errores en una línea: una excepción que escape sale con el
+# traceback estándar, sin el renderizado de Rich (lento y con variables locales)
+app = typer.Typer(add_completion=False, no_args_is_help=False,
+                  pretty_exceptions_enable=False, pretty_exceptions_show_locals=False)
 console = Console()
 
 CONFIG_PATH = Path.home() / ".ytmusic-dl.json"
-STATE_PATH = Path.home() / ".ytmusic-dl-state.json"
+# Estado de descarga: un índice con los totales y un archivo por playlist con sus pistas
+STATE_DIR = Path.home() / ".ytmusic-dl-state"
+STATE_INDEX_PATH = STATE_DIR / "index.json"
+# Formato anterior (todo el estado en un solo archivo); solo se lee para migrarlo
+LEGACY_STATE_PATH = Path.home() / ".ytmusic-dl-state.json"
+META_CACHE_DIR = Path.home() / ".ytmusic-dl-meta"
 DEFAULT_OPTS = {
     "audio_format": "mp3",
     "audio_quality": "192",
@@ -61,8 +71,23 @@ DEFAULT_OPTS = {
     "generate_m3u": True,
     "auto_resume": True,
     "connectivity_check": True,
+    "concurrency": 4,
+    # Extras por pista (cada uno añade peticiones HTTPS o pasadas de ffmpeg)
+    "embed_thumbnail": False,
+    "write_info_json": False,
+    "write_description": False,
+    # Segundos que una reanudación reutiliza la lista de pistas ya leída de cada playlist
+    "meta_cache_ttl": 3600,
+    # Solo Linux: fija cada hilo de descarga (y su ffmpeg) a un núcleo distinto
+    "pin_workers": False,
 }
 
+_BYTES_PER_MB = 1024 * 1024
+
+# Valores aceptados por `config --quality/--format`
+_VALID_QUALITIES = frozenset({"128", "192", "256", "320"})
+_VALID_FORMATS = frozenset({"mp3", "m4a", "opus"})
+
 # Estados de descarga
 class DownloadState:
     PENDING = "pending"
@@ -74,6 +99,33 @@ class DownloadState:
 
 YTM_PLAYLIST_RE = re.compile(r"^https?://(music\.)?youtube\.com/playlist\?list=", re.IGNORECASE)
 YT_PLAYLIST_RE = re.compile(r"^https?://(www\.)?youtube\.com/playlist\?list=", re.IGNORECASE)
+URL_SCHEME_RE = re.compile(r"^https?://", re.IGNORECASE)
+URL_HOST_RE = re.compile(r"(music\.)?youtube\.com", re.IGNORECASE)
+URL_MUSIC_RE = re.compile(r"music\.youtube\.com", re.IGNORECASE)
+URL_LIST_RE = re.compile(r"list=([a-zA-Z0-9_-]+)")
+# URL de playlist ya canónica (el caso habitual): una sola coincidencia la valida y da el ID.
+# "list=" distingue mayúsculas, igual que en la validación detallada
+URL_CANONICAL_PLAYLIST_RE = re.compile(
+    r"(?i:https?://(?:www\.|(music\.))?youtube\.com/playlist\?)"
+    r"list=([a-zA-Z0-9_-]+)"
+)
+YT_VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+# Sistemas de archivos típicos de memorias USB/discos externos en Windows
+REMOVABLE_FSTYPE_RE = re.compile(r"^(FAT|exFAT|NTFS)$", re.IGNORECASE)
+
+# Categorías de DownloadError que no merecen reintento, en orden de prioridad: (grupo, patrón, motivo)
+_DOWNLOAD_ERROR_CATEGORIES = (
+    ("copyright", r"copyright", "Copyright claim"),
+    ("unavail", r"unavailable|not available|removed", "Video no disponible"),
+    ("private", r"private|privado", "Video privado"),
+    ("geo", r"blocked|geo|region", "Bloqueado geográficamente"),
+    ("premium", r"premium", "Requiere suscripción premium"),
+)
+# Una sola regex con grupos nombrados: un recorrido del mensaje en lugar de uno por categoría
+DOWNLOAD_ERROR_RE = re.compile(
+    "|".join(f"(?P<{name}>{pattern})" for name, pattern, _ in _DOWNLOAD_ERROR_CATEGORIES),
+    re.IGNORECASE,
+)
 
 # ---------------------- Control de conectividad y pausa ----------------------
 
@@ -120,19 +172,34 @@ class DownloadController:
 # Instancia global del controlador
 download_controller = DownloadController()
 
+# Consulta DNS mínima (A example.com, id 0): un solo viaje UDP, sin handshake ni TIME_WAIT
+_DNS_PROBE = b"\x00\x00\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00\x07example\x03com\x00\x00\x01\x00\x01"
+_DNS_SERVERS = ("8.8.8.8", "1.1.1.1")  # Google y Cloudflare como respaldo
+# Un éxito reciente vale para las pistas que empiezan justo después (se llama una vez por pista)
+CONNECTIVITY_TTL = 2.0
+_last_online = 0.0
+
+def _dns_probe(server: str, timeout: float) -> bool:
+    import socket  # solo hace falta si se comprueba la conexión
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.settimeout(timeout)
+            s.sendto(_DNS_PROBE, (server, 53))
+            data, _ = s.recvfrom(512)
+            return len(data) >= 12
+    except OSError:
+        return False
+
 def check_internet_connection(timeout: int = 5) -> bool:
     """Verifica la conectividad a internet."""
-    try:
-        # Intentar conectar a DNS público de Google
-        socket.create_connection(("8.8.8.8", 53), timeout)
+    global _last_online
+    if time.monotonic() - _last_online < CONNECTIVITY_TTL:
         return True
-    except (socket.timeout, socket.gaierror, OSError):
-        try:
-            # Intentar con DNS de Cloudflare como backup
-            socket.create_connection(("1.1.1.1", 53), timeout)
+    for server in _DNS_SERVERS:
+        if _dns_probe(server, timeout):
+            _last_online = time.monotonic()
             return True
-        except (socket.timeout, socket.gaierror, OSError):
-            return False
+    return False
 
 def wait_for_internet_connection(max_wait_time: int = 300) -> bool:
     """Espera hasta que se restablezca la conexión a internet."""
@@ -174,41 +241,104 @@ def setup_signal_handlers():
 
 # ---------------------- Guardado y carga de estado ----------------------
 
-def save_download_state(state_data: Dict[str, Any]) -> bool:
-    """Guarda el estado actual de descarga."""
+# Durante la descarga el estado se escribe cada N pistas o cada T segundos, no tras cada una;
+# una interrupción brusca solo repite esas pistas, que luego se omiten por archivo existente
+STATE_SAVE_EVERY = 10
+STATE_SAVE_INTERVAL = 5.0
+# Las copias .backup se renuevan como mucho una vez al día, no en cada escritura
+BACKUP_MAX_AGE = 24 * 3600
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Escribe en un temporal hermano y lo renombra: un corte nunca deja el archivo truncado."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+def _rotate_backup(path: Path) -> None:
+    """Copia `path` a `.backup` si la copia no existe o tiene más de BACKUP_MAX_AGE."""
+    backup_path = path.with_suffix(path.suffix + ".backup")
     try:
-        STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Crear backup si existe
-        if STATE_PATH.exists():
-            backup_path = STATE_PATH.with_suffix('.json.backup')
-            shutil.copy2(STATE_PATH, backup_path)
+        if time.time() - backup_path.stat().st_mtime < BACKUP_MAX_AGE:
+            return
+    except OSError:
+        pass
+    try:
+        shutil.copy2(path, backup_path)
+    except FileNotFoundError:
+        pass
+
+def save_download_state(state_data: Dict[str, Any], playlist_id: Optional[str] = None) -> bool:
+    """Guarda el estado actual de descarga.
+    
+    Con `playlist_id` solo se reescribe el archivo de esa playlist (y el índice, que no
+    lleva pistas): un checkpoint cuesta lo que la playlist en curso, no todo el lote.
+    """
+    try:
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
         
         # Agregar timestamp
         state_data["last_updated"] = time.time()
-        state_data["version"] = "1.0"
+        state_data["version"] = "2.0"
         
-        STATE_PATH.write_text(json.dumps(state_data, indent=2, ensure_ascii=False), encoding='utf-8')
+        playlists = state_data.get("playlists", {})
+        # Sin índice previo (primer guardado o migración) se escriben todas las playlists
+        if playlist_id is None or not STATE_INDEX_PATH.exists():
+            ids = list(playlists)
+        else:
+            ids = [playlist_id] if playlist_id in playlists else []
+        
+        # Compacto: el estado crece con cada pista y se reescribe en cada checkpoint
+        for pid in ids:
+            shard_path = STATE_DIR / f"{pid}.json"
+            _rotate_backup(shard_path)
+            _atomic_write_bytes(shard_path, _json_dumps(playlists[pid], indent=False))
+        
+        index = {k: v for k, v in state_data.items() if k != "playlists"}
+        index["playlists"] = list(playlists)
+        _rotate_backup(STATE_INDEX_PATH)
+        _atomic_write_bytes(STATE_INDEX_PATH, _json_dumps(index, indent=False))
+        # Por si el índice conserva tamaño y mtime (sistemas de archivos con mtime grueso)
+        _has_pending_download.cache_clear()
+        
+        # El archivo único de versiones anteriores ya quedó migrado
+        if LEGACY_STATE_PATH.exists():
+            LEGACY_STATE_PATH.unlink()
         return True
         
     except Exception as e:
         console.print(f"[yellow]⚠️ Error guardando estado: {e}[/yellow]")
         return False
 
-def load_download_state() -> Dict[str, Any]:
-    """Carga el estado de descarga guardado."""
-    if not STATE_PATH.exists():
+def _read_state_json(path: Path) -> Dict[str, Any]:
+    """Lee un archivo de estado; vacío o con otro tipo de contenido equivale a {}."""
+    content = path.read_bytes()
+    if not content.strip():
         return {}
-    
+    data = _json_loads(content)
+    return data if isinstance(data, dict) else {}
+
+def load_download_state() -> Dict[str, Any]:
+    """Carga el estado de descarga guardado (índice y un archivo por playlist)."""
     try:
-        content = STATE_PATH.read_text(encoding='utf-8')
-        if not content.strip():
+        if not STATE_INDEX_PATH.exists():
+            if LEGACY_STATE_PATH.exists():
+                return _read_state_json(LEGACY_STATE_PATH)
             return {}
-            
-        state = json.loads(content)
-        if not isinstance(state, dict):
+        
+        # orjson.JSONDecodeError hereda de json.JSONDecodeError: el except sigue valiendo
+        state = _read_state_json(STATE_INDEX_PATH)
+        if not state:
             return {}
-            
+        playlists: Dict[str, Any] = {}
+        for pid in state.get("playlists") or []:
+            if not isinstance(pid, str):
+                continue
+            try:
+                playlists[pid] = _read_state_json(STATE_DIR / f"{pid}.json")
+            except FileNotFoundError:
+                # Playlist registrada pero nunca guardada (p. ej. falló al crear su carpeta)
+                continue
+        state["playlists"] = playlists
         return state
         
     except (json.JSONDecodeError, OSError) as e:
@@ -216,18 +346,35 @@ def load_download_state() -> Dict[str, Any]:
         return {}
 
 def clear_download_state() -> bool:
-    """Limpia el estado de descarga guardado."""
+    """Limpia el estado de descarga guardado (las copias .backup se conservan)."""
     try:
-        if STATE_PATH.exists():
-            STATE_PATH.unlink()
+        # Primero el índice: sin él, lo que quede ya no se considera estado
+        for path in (STATE_INDEX_PATH, LEGACY_STATE_PATH):
+            if path.exists():
+                path.unlink()
+        if STATE_DIR.is_dir():
+            with os.scandir(STATE_DIR) as it:
+                for e in it:
+                    if e.name.endswith(".json"):
+                        os.unlink(e.path)
+        _has_pending_download.cache_clear()
         return True
     except Exception as e:
         console.print(f"[yellow]⚠️ Error limpiando estado: {e}[/yellow]")
         return False
 
-def should_resume_download() -> bool:
-    """Verifica si hay una descarga pendiente de reanudar."""
-    state = load_download_state()
+def should_resume_download(state: Optional[Dict[str, Any]] = None) -> bool:
+    """Verifica si hay una descarga pendiente de reanudar.
+    
+    Acepta el estado ya cargado para no leer ni parsear el archivo dos veces. Sin él, la
+    respuesta se memoriza mientras los archivos de estado no cambien (el menú la pide en
+    cada vuelta).
+    """
+    if state is None:
+        return _has_pending_download(_state_file_key())
+    return _state_has_pending(state)
+
+def _state_has_pending(state: Dict[str, Any]) -> bool:
     if not state:
         return False
         
@@ -240,56 +387,160 @@ def should_resume_download() -> bool:
                 return True
     return False
 
+def _resume_urls(state: Dict[str, Any]) -> List[str]:
+    """URLs de las playlists de un estado guardado, en un solo recorrido (omite las entradas sin URL)."""
+    urls = []
+    for playlist_data in state.get("playlists", {}).values():
+        url = playlist_data.get("url")
+        if url:
+            urls.append(url)
+    return urls
+
+def resume_from_state(state: Dict[str, Any]) -> None:
+    """Reanuda las playlists de un estado guardado con su carpeta y configuración."""
+    base_path = Path(state["base_path"])
+    # `or` en vez de default de get(): con "config" guardada no se lee el archivo de configuración
+    cfg = state.get("config") or load_config()
+    urls = _resume_urls(state)
+    
+    console.print(f"[cyan]🔄 Reanudando {len(urls)} playlists...[/cyan]")
+    download_playlists(urls, base_path, cfg, state)
+
+def _state_file_key() -> Tuple[int, ...]:
+    """(mtime_ns, tamaño) del índice de estado y del archivo anterior: cambia con cada guardado."""
+    key: List[int] = []
+    for path in (STATE_INDEX_PATH, LEGACY_STATE_PATH):
+        try:
+            st = os.stat(path)
+            key += (st.st_mtime_ns, st.st_size)
+        except OSError:
+            key += (0, -1)
+    return tuple(key)
+
+@lru_cache(maxsize=1)
+def _has_pending_download(state_key: Tuple[int, ...]) -> bool:
+    """Resultado memorizado para una firma de los archivos de estado."""
+    return _state_has_pending(load_download_state())
+
 # ---------------------- Decoradores y Utilidades ----------------------
 
-def retry_on_failure(max_retries: int = 3, delay: float = 1.0, backoff: float = 2.0):
-    """Decorador para reintentar funciones que pueden fallar."""
+class TransientDownloadError(Exception):
+    """Fallo de descarga o de red que puede resolverse reintentando."""
+
+def retry_on_failure(max_retries: int = 3, initial_delay: float = 1.0, backoff: float = 2.0,
+                     max_delay: float = 60.0, retry_on: Tuple[type, ...] = (Exception,)):
+    """Decorador para reintentar funciones que pueden fallar.
+    
+    Solo reintenta las excepciones de `retry_on`; la espera crece por `backoff`
+    hasta `max_delay`, con un 10% de jitter para no sincronizar hilos.
+    """
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            cur_delay = initial_delay
             for attempt in range(max_retries):
                 try:
                     return func(*args, **kwargs)
-                except Exception as e:
+                except retry_on as e:
                     if attempt == max_retries - 1:
                         raise
-                    console.print(f"[yellow]Intento {attempt + 1} falló: {e}. Reintentando en {delay}s...[/yellow]")
-                    time.sleep(delay)
-                    delay *= backoff
+                    console.print(
+                        f"[yellow]Intento {attempt + 1} falló: {e}. Reintentando en {cur_delay:g}s...[/yellow]"
+                    )
+                    time.sleep(cur_delay + random.uniform(0, cur_delay * 0.1))
+                    cur_delay = min(cur_delay * backoff, max_delay)
             return None
         return wrapper
     return decorator
 
+_UNSAFE_PATH_CHARS_RE = re.compile(r'[<>:"|?*]')
+
+@lru_cache(maxsize=64)
+def _resolved_base(base: Path) -> str:
+    """Ruta absoluta real de una carpeta base (una sola resolución por base y ejecución)."""
+    return str(base.resolve())
+
 def safe_path_join(base: Path, *parts: str) -> Path:
     """Une rutas de forma segura previniendo path traversal."""
+    # Solo la base toca el sistema de archivos (una vez por base); el resto se valida léxicamente
+    base_resolved = _resolved_base(base)
     result = base
+    candidate = base_resolved
     for part in parts:
         # Sanitizar cada parte
-        safe_part = re.sub(r'[<>:"|?*]', '_', part)
+        safe_part = _UNSAFE_PATH_CHARS_RE.sub('_', part)
         safe_part = safe_part.replace('..', '_')
         result = result / safe_part
+        candidate = os.path.join(candidate, safe_part)
     
     # Verificar que el resultado está dentro del directorio base
-    try:
-        result.resolve().relative_to(base.resolve())
-        return result
-    except ValueError:
+    candidate = os.path.normpath(candidate)
+    if candidate != base_resolved and not candidate.startswith(base_resolved.rstrip(os.sep) + os.sep):
         raise ValueError(f"Ruta insegura detectada: {result}")
+    return result
+
+def _ellipsize(s: str, n: int) -> str:
+    """Recorta `s` a `n` caracteres añadiendo "..."; sin copia si ya cabe."""
+    return s if len(s) <= n else s[:n] + "..."
 
 # ---------------------- Config ----------------------
 
+def _json_loads(raw: bytes) -> Any:
+    """Parsea JSON desde bytes usando orjson si está disponible."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    # json.loads acepta bytes y detecta UTF-8/16/32 sin decodificar aparte
+    return json.loads(raw)
+
+def _json_dumps(obj: Any, indent: bool = True) -> bytes:
+    """Serializa a JSON (UTF-8) usando orjson si está disponible.
+    
+    Con `indent=False` sale compacto: para archivos que solo lee el programa.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# Último dict escrito por save_config con el (mtime_ns, tamaño) resultante: evita releerlo
+_last_saved_config: Optional[Tuple[int, int, Dict[str, Any]]] = None
+
 def load_config() -> Dict[str, Any]:
+    """Carga configuración, reutilizando el resultado mientras el archivo no cambie."""
+    try:
+        st = os.stat(CONFIG_PATH)
+        # El tamaño cubre ediciones externas en sistemas con mtime de baja resolución (FAT: 2 s)
+        mtime_ns, size = st.st_mtime_ns, st.st_size
+    except OSError:
+        mtime_ns, size = 0, -1
+    saved = _last_saved_config
+    if saved is not None and saved[0] == mtime_ns and saved[1] == size:
+        return dict(saved[2])
+    # Copia para que los llamadores puedan modificarla sin tocar la caché
+    return dict(_load_config_cached(str(CONFIG_PATH), mtime_ns, size))
+
+@lru_cache(maxsize=4)
+def _load_config_cached(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
     """Carga configuración con manejo robusto de errores."""
-    if not CONFIG_PATH.exists():
+    try:
+        # Una sola lectura en bytes sin decodificación de texto
+        content = Path(path).read_bytes()
+    except FileNotFoundError:
+        return DEFAULT_OPTS.copy()
+    except (OSError, PermissionError) as e:
+        console.print(f"[red]Error accediendo al archivo de config:[/red] {e}")
+        console.print("[yellow]Usando configuración por defecto[/yellow]")
         return DEFAULT_OPTS.copy()
     
     try:
-        content = CONFIG_PATH.read_text(encoding='utf-8')
         if not content.strip():
             console.print("[yellow]Archivo de configuración vacío, usando valores por defecto[/yellow]")
             return DEFAULT_OPTS.copy()
             
-        loaded = json.loads(content)
+        # orjson.JSONDecodeError hereda de json.JSONDecodeError
+        loaded = _json_loads(content)
         if not isinstance(loaded, dict):
             raise ValueError("Configuración debe ser un objeto JSON")
             
@@ -303,17 +554,13 @@ def load_config() -> Dict[str, Any]:
         console.print("[red]No se puede continuar con configuración inválida[/red]")
         sys.exit(1)
         
-    except (OSError, PermissionError) as e:
-        console.print(f"[red]Error accediendo al archivo de config:[/red] {e}")
-        console.print("[yellow]Usando configuración por defecto[/yellow]")
-        return DEFAULT_OPTS.copy()
-        
     except Exception as e:
         console.print(f"[red]Error inesperado cargando config:[/red] {e}")
         return DEFAULT_OPTS.copy()
 
 def save_config(cfg: Dict[str, Any]) -> bool:
     """Guarda configuración con validación y manejo de errores."""
+    global _last_saved_config
     if not isinstance(cfg, dict):
         console.print("[red]Error: configuración debe ser un diccionario[/red]")
         return False
@@ -322,13 +569,16 @@ def save_config(cfg: Dict[str, Any]) -> bool:
         # Validar que la carpeta padre existe
         CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
         
-        # Crear backup si existe
-        if CONFIG_PATH.exists():
-            backup_path = CONFIG_PATH.with_suffix('.json.backup')
-            shutil.copy2(CONFIG_PATH, backup_path)
+        _rotate_backup(CONFIG_PATH)
         
         # Escribir nueva configuración
-        CONFIG_PATH.write_text(json.dumps(cfg, indent=2, ensure_ascii=False), encoding='utf-8')
+        _atomic_write_bytes(CONFIG_PATH, _json_dumps(cfg))
+        _load_config_cached.cache_clear()
+        try:
+            st = os.stat(CONFIG_PATH)
+            _last_saved_config = (st.st_mtime_ns, st.st_size, {**DEFAULT_OPTS, **cfg})
+        except OSError:
+            _last_saved_config = None
         console.print("[green]✅ Configuración guardada correctamente[/green]")
         return True
         
@@ -341,10 +591,13 @@ def save_config(cfg: Dict[str, Any]) -> bool:
 
 # ---------------------- Dependencias ----------------------
 
+@lru_cache(maxsize=1)
 def which_ffmpeg() -> Optional[str]:
+    # El PATH no cambia durante la sesión: una sola búsqueda basta
     return shutil.which("ffmpeg")
 
 def check_dependencies_panel() -> Panel:
+    import yt_dlp
     ff = which_ffmpeg()
     status_ff = "[green]OK[/green]" if ff else "[red]FALTA[/red]"
     yt_ver = getattr(yt_dlp, "version", None)
@@ -366,61 +619,97 @@ def human_os() -> str:
         "Linux": "Linux",
     }.get(platform.system(), platform.system())
 
+@lru_cache(maxsize=1)
+def _partitions_cached() -> Tuple[Tuple[str, str], ...]:
+    """(mountpoint, fstype) de psutil, memorizado durante un flujo de selección de USB."""
+    import psutil
+    return tuple((p.mountpoint, p.fstype) for p in psutil.disk_partitions(all=False))
+
+MOUNT_ROOTS = ("/media", "/mnt", "/run/media", "/Volumes")
+ROOT_SCAN_TIMEOUT = 2.0
+
+def _scan_root(root: str) -> List[str]:
+    """Subcarpetas de una raíz de montaje (vacío si no existe o no es legible)."""
+    try:
+        with os.scandir(root) as it:
+            # is_dir() sigue enlaces (los montajes pueden serlo) pero usa el dirent si no lo son
+            return [e.path for e in it if e.is_dir()]
+    except OSError:
+        return []
+
 def candidate_removable_paths() -> List[Path]:
     """
     Detecta unidades/montajes removibles.
     - Windows: usa GetDriveTypeW (DRIVE_REMOVABLE = 2), luego fallback psutil
     - macOS/Linux: psutil + raíces comunes
     """
+    # El conjunto evita duplicados al vuelo conservando el orden de detección
     candidates: List[Path] = []
+    seen: Set[str] = set()
+
+    def add(path: str) -> None:
+        key = str(Path(path))
+        if key not in seen:
+            seen.add(key)
+            candidates.append(Path(key))
+
     sysname = platform.system()
 
     if sysname == "Windows":
-        # API nativa
+        # API nativa (ctypes solo se carga en Windows)
         try:
+            import ctypes
+            import string
             DRIVE_REMOVABLE = 2
-            GetDriveTypeW = ctypes.windll.kernel32.GetDriveTypeW
-            for letter in string.ascii_uppercase:
+            kernel32 = ctypes.windll.kernel32
+            GetDriveTypeW = kernel32.GetDriveTypeW
+            # Bitmask de unidades presentes: evita consultar las 26 letras
+            drive_mask = kernel32.GetLogicalDrives()
+            for i, letter in enumerate(string.ascii_uppercase):
+                if not (drive_mask >> i) & 1:
+                    continue
                 root = f"{letter}:\\"
                 dtype = GetDriveTypeW(ctypes.c_wchar_p(root))
                 if dtype == DRIVE_REMOVABLE:
-                    candidates.append(Path(root))
+                    add(root)
         except Exception:
             pass
         # Fallback psutil (sin C:)
         try:
-            for p in psutil.disk_partitions(all=False):
-                mount = Path(p.mountpoint)
-                if p.fstype and re.match(r"^(FAT|exFAT|NTFS)$", p.fstype, re.I):
-                    if not str(mount).upper().startswith("C:"):
-                        if mount not in candidates:
-                            candidates.append(mount)
+            for mountpoint, fstype in _partitions_cached():
+                if fstype and REMOVABLE_FSTYPE_RE.match(fstype):
+                    if not mountpoint.upper().startswith("C:"):
+                        add(mountpoint)
         except Exception:
             pass
         return candidates
 
     # macOS / Linux
     try:
-        for p in psutil.disk_partitions(all=False):
-            if any(s in p.mountpoint for s in ["/media/", "/mnt/", "/run/media/", "/Volumes/"]):
-                candidates.append(Path(p.mountpoint))
+        for mountpoint, _ in _partitions_cached():
+            if any(f"{r}/" in mountpoint for r in MOUNT_ROOTS):
+                add(mountpoint)
     except Exception:
         pass
-    for root in ["/media", "/mnt", "/run/media", "/Volumes"]:
-        d = Path(root)
-        if d.exists():
-            for child in d.iterdir():
-                if child.is_dir():
-                    candidates.append(child)
-    # de-dup
-    seen = set()
-    uniq: List[Path] = []
-    for c in candidates:
-        s = str(c)
-        if s not in seen:
-            seen.add(s)
-            uniq.append(c)
-    return uniq
+    # Las raíces se exploran en paralelo: un montaje de red colgado no bloquea a las demás.
+    # Hilos daemon y no un ThreadPoolExecutor: concurrent.futures une sus hilos al salir
+    # del intérprete, y un scandir colgado retrasaría el cierre del programa
+    found: Dict[str, List[str]] = {}
+
+    def scan(root: str) -> None:
+        found[root] = _scan_root(root)
+
+    threads = [threading.Thread(target=scan, args=(root,), daemon=True) for root in MOUNT_ROOTS]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + ROOT_SCAN_TIMEOUT
+    for t in threads:
+        t.join(max(0.0, deadline - time.monotonic()))
+    # Las raíces que no respondieron a tiempo se ignoran; sus hilos quedan abandonados
+    for root in MOUNT_ROOTS:
+        for path in found.get(root, ()):
+            add(path)
+    return candidates
 
 def choose_output_folder(default_base: Path) -> Path:
     console.print(Panel.fit("Elige carpeta de salida (donde está montada tu USB)."))
@@ -438,6 +727,8 @@ def choose_output_folder(default_base: Path) -> Path:
     console.print("[dim]Enter acepta el valor por defecto, o escribe un número o ruta personalizada.[/dim]")
     default_str = str(default_base)
     choice = Prompt.ask("Carpeta de salida", default=default_str)
+    # Permite detectar unidades conectadas después de este punto
+    _partitions_cached.cache_clear()
     if choice.isdigit() and rows:
         i = int(choice)
         for idx, path in rows:
@@ -451,6 +742,7 @@ def auto_choose_output_folder(default_base: Path) -> Path:
     preferred = candidates[0] if candidates else None
     if preferred:
         if Confirm.ask(f"Se detectó una unidad/montaje: [bold]{preferred}[/bold]\n¿Quieres guardar ahí?", default=True):
+            _partitions_cached.cache_clear()
             return Path(preferred)
         return choose_output_folder(default_base)
     console.print(Panel.fit("No se detectó USB automáticamente. Selecciona una carpeta.", border_style="yellow"))
@@ -460,21 +752,46 @@ def auto_choose_output_folder(default_base: Path) -> Path:
 
 SAFE_MAX_NAME = 60
 
-def strip_accents(s: str) -> str:
-    # NFKD + elimina diacríticos → USB/autoradios más felices
+def _strip_accents_slow(s: str) -> str:
     return "".join(c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c))
 
+# Tabla precalculada para Latin-1 + Latin Extended-A/B (á→a, ñ→n, ...) y Latin Extended
+# Additional (ạ, ế, ỳ: títulos vietnamitas y transliteraciones)
+_ACCENT_TABLE = {
+    cp: stripped
+    for cp in (*range(0xC0, 0x250), *range(0x1E00, 0x1F00))
+    for stripped in (_strip_accents_slow(chr(cp)),)
+    if stripped != chr(cp)
+}
+
+def strip_accents(s: str) -> str:
+    # NFKD + elimina diacríticos → USB/autoradios más felices
+    if s.isascii():
+        return s
+    # Caso común (títulos latinos): una sola pasada en C con str.translate
+    s = s.translate(_ACCENT_TABLE)
+    if s.isascii():
+        return s
+    return _strip_accents_slow(s)
+
+# Comillas curvas: sustitución fija en una sola pasada de str.translate
+_QUOTE_TRANS = str.maketrans({"“": "", "”": "", "’": "'"})
+_FAT_INVALID_RE = re.compile(r"[\\/:*?\"<>|]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Función pura: al reanudar se repiten los mismos títulos de playlist
+@lru_cache(maxsize=1024)
 def safe_name(s: str, default: str = "Playlist") -> str:
     if not s:
         return default
     s = strip_accents(s.strip())
     if not s:
         return default
-    # Restringir a nombres amigables para FAT/Windows
-    s = re.sub(r"[\\/:*?\"<>|]+", "_", s)
+    # Restringir a nombres amigables para FAT/Windows (antes de quitar las comillas curvas:
+    # "a:“:b" debe seguir dando "a__b", el nombre de carpeta de las bibliotecas existentes)
+    s = _FAT_INVALID_RE.sub("_", s)
     # Espacios raros y comillas curvas
-    s = s.replace("“", "").replace("”", "").replace("’", "'")
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _WHITESPACE_RE.sub(" ", s.translate(_QUOTE_TRANS)).strip()
     if len(s) > SAFE_MAX_NAME:
         s = s[:SAFE_MAX_NAME].rstrip()
     return s or default
@@ -490,12 +807,18 @@ def validate_playlist_url(url: str) -> Tuple[bool, str, str]:
     
     url = url.strip()
     
+    # Camino rápido: con el mismo resultado que las comprobaciones de abajo
+    canonical = URL_CANONICAL_PLAYLIST_RE.fullmatch(url)
+    if canonical:
+        host = "music" if canonical.group(1) else "www"
+        return True, "URL válida", f"https://{host}.youtube.com/playlist?list={canonical.group(2)}"
+    
     # Verificar formato básico de URL
-    if not re.match(r'^https?://', url, re.IGNORECASE):
+    if not URL_SCHEME_RE.match(url):
         return False, "URL debe comenzar con http:// o https://", url
     
     # Verificar dominio YouTube
-    if not re.search(r'(music\.)?youtube\.com', url, re.IGNORECASE):
+    if not URL_HOST_RE.search(url):
         return False, "Solo se admiten URLs de YouTube/YouTube Music", url
     
     # Verificar que sea una playlist
@@ -503,10 +826,10 @@ def validate_playlist_url(url: str) -> Tuple[bool, str, str]:
         return False, "URL debe contener un parámetro 'list=' (playlist)", url
     
     # Normalizar URL (remover parámetros innecesarios)
-    list_match = re.search(r'list=([a-zA-Z0-9_-]+)', url)
+    list_match = URL_LIST_RE.search(url)
     if list_match:
         playlist_id = list_match.group(1)
-        if 'music.youtube.com' in url.lower():
+        if URL_MUSIC_RE.search(url):
             normalized_url = f"https://music.youtube.com/playlist?list={playlist_id}"
         else:
             normalized_url = f"https://www.youtube.com/playlist?list={playlist_id}"
@@ -529,7 +852,7 @@ def validate_urls_enhanced(urls: List[str]) -> Tuple[List[str], List[Tuple[str,
             valid.append(normalized_url)
         else:
             error_msg = f"URL {i}: {message}"
-            errors.append((error_msg, url[:80] + "..." if len(url) > 80 else url))
+            errors.append((error_msg, _ellipsize(url, 80)))
     
     return valid, errors
 
@@ -560,11 +883,77 @@ class QuietLogger:
     def warning(self, msg): pass
     def error(self, msg):   console.print(f"[red]{msg}[/red]")
 
-def build_ydl_opts_for_playlist(output_dir: Path, audio_format: str, audio_quality: str) -> Dict[str, Any]:
+# Las descargas en paralelo ya solapan red y ffmpeg entre hilos; este semáforo limita los
+# transcodificados simultáneos a los núcleos disponibles para que no compitan por CPU
+_ENCODE_SLOTS = threading.BoundedSemaphore(max(1, os.cpu_count() or 1))
+_ENCODE_PP_KEYS = frozenset({"ExtractAudio", "FFmpegExtractAudio"})
+_encode_local = threading.local()
+
+def _release_encode_slot() -> None:
+    if getattr(_encode_local, "held", False):
+        _encode_local.held = False
+        _ENCODE_SLOTS.release()
+
+def _encode_slot_hook(d: Dict[str, Any]) -> None:
+    """postprocessor_hook de yt-dlp: toma un cupo al empezar la extracción de audio y lo suelta al terminar.
+    
+    Los hooks corren en el hilo que llamó a download(), así que el estado es por hilo.
+    """
+    if d.get("postprocessor") not in _ENCODE_PP_KEYS:
+        return
+    status = d.get("status")
+    if status == "started" and not getattr(_encode_local, "held", False):
+        _ENCODE_SLOTS.acquire()
+        _encode_local.held = True
+    elif status == "finished":
+        _release_encode_slot()
+
+def _make_worker_pinner() -> Optional[Callable[[], None]]:
+    """Initializer del pool de descargas que fija cada hilo nuevo al siguiente núcleo permitido.
+    
+    En Linux sched_setaffinity(0) afecta solo al hilo que la llama y los procesos que lanza
+    (el ffmpeg de yt-dlp) heredan su máscara. None si el sistema no lo admite.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return None
+    try:
+        cores = sorted(os.sched_getaffinity(0))
+    except OSError:
+        return None
+    if len(cores) < 2:
+        return None
+    lock = threading.Lock()
+    next_core = [0]
+    
+    def pin() -> None:
+        with lock:
+            core = cores[next_core[0] % len(cores)]
+            next_core[0] += 1
+        try:
+            os.sched_setaffinity(0, {core})
+        except OSError:
+            pass
+    
+    return pin
+
+def build_ydl_opts_for_playlist(output_dir: Path, audio_format: str, audio_quality: str,
+                                cfg: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Crea opciones de yt-dlp que guardan DIRECTO en la carpeta de la playlist.
+    
+    Miniatura, .info.json y .description son opcionales vía cfg (desactivados por defecto).
     """
+    cfg = cfg or {}
+    embed_thumbnail = bool(cfg.get("embed_thumbnail", DEFAULT_OPTS["embed_thumbnail"]))
+    concurrency = max(1, int(cfg.get("concurrency", DEFAULT_OPTS["concurrency"])))
     outtmpl = str(output_dir / "%(title)s.%(ext)s")
+    postprocessors = [
+        {"key": "FFmpegExtractAudio", "preferredcodec": audio_format, "preferredquality": audio_quality},
+        {"key": "FFmpegMetadata", "add_metadata": True},
+    ]
+    if embed_thumbnail:
+        # La API de Python no embebe por "embedthumbnail"; hace falta el postprocesador
+        postprocessors.append({"key": "EmbedThumbnail", "already_have_thumbnail": False})
     return {
         "format": "bestaudio/best",
         "outtmpl": outtmpl,
@@ -577,10 +966,16 @@ def build_ydl_opts_for_playlist(output_dir: Path, audio_format: str, audio_quali
         "windowsfilenames": True,
         "restrictfilenames": True,
         "trim_file_name": SAFE_MAX_NAME,
+        
+        # Registro de IDs descargados: en la siguiente sincronización se omiten sin pedir la página
+        "download_archive": str(output_dir / ARCHIVE_NAME),
 
-        # Miniatura embebida (si tu estéreo falla, cambia a False)
-        "writethumbnail": True,
-        "embedthumbnail": True,
+        # Miniatura embebida (si tu estéreo falla, deja embed_thumbnail en False)
+        "writethumbnail": embed_thumbnail,
+        "writeinfojson": bool(cfg.get("write_info_json", DEFAULT_OPTS["write_info_json"])),
+        "writedescription": bool(cfg.get("write_description", DEFAULT_OPTS["write_description"])),
+        "writesubtitles": False,
+        "writeautomaticsub": False,
 
         # Silencio de consola de yt-dlp (mantenemos nuestros mensajes)
         "quiet": True,
@@ -590,10 +985,8 @@ def build_ydl_opts_for_playlist(output_dir: Path, audio_format: str, audio_quali
         "prefer_ffmpeg": True,
 
         # Post-procesado: MP3 CBR 192 kbps @ 44.1 kHz + ID3v2.3
-        "postprocessors": [
-            {"key": "FFmpegExtractAudio", "preferredcodec": audio_format, "preferredquality": audio_quality},
-            {"key": "FFmpegMetadata", "add_metadata": True},
-        ],
+        "postprocessors": postprocessors,
+        "postprocessor_hooks": [_encode_slot_hook],
         "postprocessor_args": [
             "-codec:a", "libmp3lame",
             "-b:a", "192k",
@@ -601,56 +994,370 @@ def build_ydl_opts_for_playlist(output_dir: Path, audio_format: str, audio_quali
             "-write_id3v2", "1",
             "-id3v2_version", "3",
             "-map_metadata", "0",
+            # Con varias pistas en paralelo cada ffmpeg usa un hilo: _ENCODE_SLOTS deja
+            # una codificación por núcleo y las descargas siguen sin competir por CPU
+            *(["-threads", "1"] if concurrency > 1 else []),
         ],
 
         # Robustez
         "retries": 5,
         "fragment_retries": 5,
-        "concurrent_fragments": 5,
+        "concurrent_fragment_downloads": 4,
         "skip_unavailable_fragments": True,
+        
+        # Con varias descargas simultáneas, una pausa aleatoria corta antes de cada pista
+        # evita ráfagas de peticiones que YouTube limita (HTTP 429)
+        **({"sleep_interval": 1, "max_sleep_interval": 3} if concurrency > 1 else {}),
     }
 
+class ThreadLocalYDL:
+    """Entrega una instancia de YoutubeDL por hilo (YoutubeDL no es seguro entre hilos)."""
+    
+    def __init__(self, opts: Dict[str, Any]):
+        self._opts = opts
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._instances: List[Any] = []
+        
+    def get(self) -> Any:
+        ydl = getattr(self._local, "ydl", None)
+        if ydl is None:
+            import yt_dlp
+            ydl = yt_dlp.YoutubeDL(self._opts)
+            self._local.ydl = ydl
+            with self._lock:
+                self._instances.append(ydl)
+        return ydl
+        
+    def close(self) -> None:
+        with self._lock:
+            instances, self._instances = self._instances, []
+        for ydl in instances:
+            try:
+                ydl.close()
+            except Exception:
+                pass
+                
+    def __enter__(self) -> "ThreadLocalYDL":
+        return self
+        
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+# Archivo de descargas de yt-dlp por carpeta de playlist: una línea "<extractor> <id>" por pista
+ARCHIVE_NAME = ".downloaded.txt"
+
+def _load_archive_ids(folder: Path) -> Set[str]:
+    """Líneas del archivo de descargas de `folder` (vacío si aún no existe)."""
+    try:
+        with open(folder / ARCHIVE_NAME, "r", encoding="utf-8", errors="ignore") as f:
+            return {line.strip() for line in f if line.strip()}
+    except OSError:
+        return set()
+
+def _archive_key(entry: Dict[str, Any]) -> Optional[str]:
+    """Clave con el mismo formato que escribe yt-dlp en download_archive."""
+    video_id = entry.get("id")
+    if not video_id:
+        return None
+    extractor = entry.get("ie_key") or entry.get("extractor_key") or "Youtube"
+    return f"{extractor.lower()} {video_id}"
+
+def clear_download_archives(base: Path) -> int:
+    """Borra los archivos de descargas de cada playlist (para volver a bajar pistas eliminadas a mano)."""
+    removed = 0
+    for folder in _playlist_dirs(base, skip_private=False):
+        try:
+            (folder / ARCHIVE_NAME).unlink()
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+def _existing_stems(folder: Path, suffix: str) -> Set[str]:
+    """Nombres (sin extensión) de los archivos `suffix` ya presentes en `folder`."""
+    try:
+        with os.scandir(folder) as it:
+            return {e.name[:-len(suffix)] for e in it if e.name.endswith(suffix) and e.is_file()}
+    except OSError:
+        return set()
+
+def _download_track_task(ydl_pool: ThreadLocalYDL, entry: dict, idx: int, playlist_id: str,
+                         existing_stems: Set[str]) -> Optional[Tuple[bool, str]]:
+    """Descarga una pista desde un hilo del pool. Devuelve None si la descarga fue pausada/detenida."""
+    # Verificar si debemos continuar
+    if not download_controller.is_running():
+        return None
+    
+    try:
+        return download_single_track(ydl_pool.get(), entry, idx, playlist_id, existing_stems)
+    finally:
+        # Si ffmpeg falló a mitad, el hook no llegó a "finished"
+        _release_encode_slot()
+
 # ---------------------- Deduplicación ----------------------
 
 def _synchsafe_to_int(b: bytes) -> int:
-    return ((b[0] & 0x7F) << 21) | ((b[1] & 0x7F) << 14) | ((b[2] & 0x7F) << 7) | (b[3] & 0x7F)
+    v = int.from_bytes(b[:4], "big")
+    return ((v & 0x7F000000) >> 3) | ((v & 0x7F0000) >> 2) | ((v & 0x7F00) >> 1) | (v & 0x7F)
+
+def _new_audio_hasher() -> Any:
+    """Hasher no criptográfico para huellas de audio: BLAKE3 si está instalado, si no BLAKE2b-128."""
+    if _blake3 is not None:
+        return _blake3()
+    return hashlib.blake2b(digest_size=16)
+
+def _audio_digest(hasher: Any) -> str:
+    """Hex de 128 bits con ambos algoritmos: BLAKE3 es XOF y admite cualquier longitud."""
+    if _blake3 is not None:
+        return hasher.hexdigest(length=16)
+    return hasher.hexdigest()
+
+def _mp3_audio_bounds(f: Any, size: int) -> Tuple[int, int]:
+    """Devuelve (inicio, fin) del flujo de audio saltando ID3v2 al inicio e ID3v1 al final."""
+    start = 0
+    end = size
+    header = f.read(10)
+    if len(header) == 10 and header[:3] == b"ID3":
+        tag_size = _synchsafe_to_int(header[6:10])
+        start = 10 + tag_size
+    if size >= 128:
+        f.seek(-128, os.SEEK_END)
+        if f.read(3) == b"TAG":
+            end = size - 128
+    return start, end
+
+def mp3_audio_size(path: Path, size: int) -> Optional[int]:
+    """Tamaño del flujo de audio sin etiquetas, leyendo solo las cabeceras."""
+    try:
+        if size <= 0:
+            return None
+        with path.open("rb") as f:
+            start, end = _mp3_audio_bounds(f, size)
+        return max(0, end - start)
+    except Exception:
+        return None
+
+SAMPLE_WINDOW = 64 * 1024
+# A partir de cuántos hashes completos se muestra barra de progreso
+DEDUP_PROGRESS_MIN = 20
+
+def mp3_sampled_fingerprint(path: Path, size: Optional[int] = None) -> Optional[str]:
+    """Huella rápida del audio: 3 ventanas de 64 KB (inicio, mitad y final, sin etiquetas).
+    
+    Si no coincide entre dos archivos, no son duplicados. Si coincide, hay que confirmarlo
+    con mp3_audio_hash. Devuelve None cuando el audio es tan corto que conviene el hash completo.
+    `size` evita repetir el stat cuando quien llama ya lo tiene del recorrido.
+    """
+    try:
+        if size is None:
+            size = path.stat().st_size
+        with path.open("rb") as f:
+            start, end = _mp3_audio_bounds(f, size)
+            if end - start <= 3 * SAMPLE_WINDOW:
+                return None
+            hasher = _new_audio_hasher()
+            for offset in (start, start + (end - start - SAMPLE_WINDOW) // 2, end - SAMPLE_WINDOW):
+                f.seek(offset)
+                hasher.update(f.read(SAMPLE_WINDOW))
+            return _audio_digest(hasher)
+    except Exception:
+        return None
+
+_HAS_FILE_DIGEST = hasattr(hashlib, "file_digest")
 
-def mp3_audio_hash(path: Path, chunk_size: int = 1024 * 1024) -> Optional[str]:
-    """MD5 del flujo de audio MP3 ignorando etiquetas ID3v2/ID3v1."""
+def mp3_audio_hash(path: Path, size: Optional[int] = None) -> Optional[str]:
+    """Huella (BLAKE3/BLAKE2b) del flujo de audio MP3 ignorando etiquetas ID3v2/ID3v1."""
     try:
-        size = path.stat().st_size
+        if size is None:
+            size = path.stat().st_size
         if size <= 0:
             return None
-        start = 0
-        end = size
         with path.open("rb") as f:
-            header = f.read(10)
-            if len(header) == 10 and header[:3] == b"ID3":
-                tag_size = _synchsafe_to_int(header[6:10])
-                start = 10 + tag_size
-            if size >= 128:
-                f.seek(-128, os.SEEK_END)
-                if f.read(3) == b"TAG":
-                    end = size - 128
-            hasher = hashlib.md5()
-            f.seek(start)
-            remaining = max(0, end - start)
-            while remaining > 0:
-                to_read = min(chunk_size, remaining)
-                chunk = f.read(to_read)
-                if not chunk:
-                    break
-                hasher.update(chunk)
-                remaining -= len(chunk)
-            return hasher.hexdigest()
+            start, end = _mp3_audio_bounds(f, size)
+            hasher = _new_audio_hasher()
+            if end > start:
+                # Solo se mapea el rango de audio; el offset debe ir alineado a la granularidad
+                map_start = start - start % mmap.ALLOCATIONGRANULARITY
+                try:
+                    # Un único update sobre el mapa en memoria: sin bucle de lecturas en Python
+                    with mmap.mmap(f.fileno(), end - map_start, offset=map_start, access=mmap.ACCESS_READ) as mm, \
+                            memoryview(mm) as mv:
+                        hasher.update(mv[start - map_start:])
+                except (OSError, ValueError, OverflowError):
+                    # Sistemas de archivos sin mmap (FUSE, algunos recursos de red) o sin espacio de direcciones
+                    f.seek(start)
+                    if end == size and _HAS_FILE_DIGEST:
+                        # Sin ID3v1 el audio llega hasta EOF: bucle de lectura en C (3.11+)
+                        hasher = hashlib.file_digest(f, _new_audio_hasher)
+                    else:
+                        hasher = _new_audio_hasher()
+                        # Un único búfer reutilizado con readinto: sin un bytes nuevo por bloque
+                        buf = memoryview(bytearray(1024 * 1024))
+                        remaining = end - start
+                        while remaining > 0:
+                            n = f.readinto(buf[:min(len(buf), remaining)])
+                            if not n:
+                                break
+                            hasher.update(buf[:n])
+                            remaining -= n
+            return _audio_digest(hasher)
     except Exception:
         return None
 
-def scan_duplicates(base: Path) -> Tuple[int, List[Tuple[Path, List[Path]]]]:
-    files = list(base.glob("*/*.mp3"))
+HASH_CACHE_NAME = "_hashcache.json"
+
+def _iter_mp3s(base: Path) -> Iterator[Tuple[Path, os.stat_result]]:
+    """Recorre los MP3 de cada carpeta de playlist (un nivel) con os.scandir."""
+    with os.scandir(base) as subdirs:
+        for sub in subdirs:
+            if not sub.is_dir(follow_symlinks=False) or sub.name == "_duplicates":
+                continue
+            try:
+                with os.scandir(sub.path) as it:
+                    for f in it:
+                        if f.name.endswith(".mp3") and f.is_file(follow_symlinks=False):
+                            yield Path(f.path), f.stat(follow_symlinks=False)
+            except OSError:
+                continue
+
+def _audio_hash_algo() -> str:
+    return "blake3-128" if _blake3 is not None else "blake2b-128"
+
+def _load_hash_cache(base: Path) -> Dict[str, list]:
+    """Carga la caché de huellas {ruta_relativa: [tamaño:mtime_ns, hash, tamaño_audio, muestra]}."""
+    try:
+        data = _json_loads((base / HASH_CACHE_NAME).read_bytes())
+        if isinstance(data, dict) and data.get("algo") == _audio_hash_algo():
+            files = data.get("files")
+            if isinstance(files, dict):
+                return files
+    except Exception:
+        pass
+    return {}
+
+def _save_hash_cache(base: Path, cache: Dict[str, list]) -> None:
+    try:
+        # En la raíz de la USB: un corte a mitad de escritura no debe dejar la caché truncada
+        data = _json_dumps({"algo": _audio_hash_algo(), "files": cache}, indent=False)
+        _atomic_write_bytes(base / HASH_CACHE_NAME, data)
+    except Exception:
+        pass
+
+def scan_duplicates(base: Path,
+                    mp3_entries: Optional[List[Tuple[Path, os.stat_result]]] = None
+                    ) -> Tuple[int, List[Tuple[Path, List[Path]]]]:
+    if mp3_entries is None:
+        found = list(_iter_mp3s(base))
+    else:
+        # Reutilizar un recorrido recursivo ya hecho: solo MP3 directos de cada playlist
+        found = [
+            (p, st) for p, st in mp3_entries
+            if p.parent.parent == base and p.parent.name != "_duplicates"
+        ]
+    files = [p for p, _ in found]
+    cache = _load_hash_cache(base)
+    new_cache: Dict[str, list] = {}
+
+    # El stat del recorrido sirve para la clave de caché y para ordenar
+    mtimes: Dict[Path, float] = {}
+    file_sizes: Dict[Path, int] = {}
+    entries: Dict[Path, Tuple[str, str]] = {}
+    hashes: Dict[Path, Optional[str]] = {}
+    audio_sizes: Dict[Path, Optional[int]] = {}
+    samples: Dict[Path, Optional[str]] = {}
+    # Los archivos sin entrada válida en la caché se miden después, en el pool
+    to_measure: List[Path] = []
+    for p, st in found:
+        mtimes[p] = st.st_mtime
+        file_sizes[p] = st.st_size
+        rel = p.relative_to(base).as_posix()
+        key = f"{st.st_size}:{st.st_mtime_ns}"
+        entries[p] = (rel, key)
+        cached = cache.get(rel)
+        if isinstance(cached, list) and len(cached) in (3, 4) and cached[0] == key:
+            audio_sizes[p] = cached[2]
+            hashes[p] = cached[1] or None
+            samples[p] = (cached[3] or None) if len(cached) == 4 else None
+        else:
+            to_measure.append(p)
+            hashes[p] = None
+            samples[p] = None
+    # hashlib libera el GIL con buffers grandes: el hashing escala con hilos. Más de 8
+    # lecturas simultáneas ya no ganan ancho de banda y en discos giratorios solo añaden seeks
+    with ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 2) * 2)) as executor:
+        # Medir el audio abre cada archivo y lee sus cabeceras: en USB la latencia domina,
+        # así que los archivos sin caché se miden en los mismos hilos que muestras y hashes
+        measure_sizes = [file_sizes[p] for p in to_measure]
+        for p, audio_size in zip(to_measure, executor.map(mp3_audio_size, to_measure, measure_sizes)):
+            audio_sizes[p] = audio_size
+        # Solo puede haber duplicados entre archivos con el mismo tamaño de audio
+        # (sin etiquetas); los que no se pueden medir caen en el grupo None.
+        by_size: Dict[Optional[int], List[Path]] = {}
+        for p, _ in found:
+            by_size.setdefault(audio_sizes[p], []).append(p)
+
+        candidates = [
+            p for audio_size, group in by_size.items()
+            if audio_size is None or len(group) > 1
+            for p in group
+        ]
+        # Grupos de igual tamaño con algún miembro sin hash completo: primero una muestra de
+        # 3 ventanas (también guardada en caché) y solo las muestras repetidas pasan al hash completo
+        sampled_groups = [
+            group for audio_size, group in by_size.items()
+            if audio_size is not None and len(group) > 1 and not all(hashes[q] for q in group)
+        ]
+        to_sample = [p for group in sampled_groups for p in group if samples[p] is None]
+        unique: Set[Path] = set()
+        # Los tamaños del recorrido evitan un stat más por archivo al muestrear y al hashear
+        sample_sizes = [file_sizes[p] for p in to_sample]
+        for p, fp in zip(to_sample, executor.map(mp3_sampled_fingerprint, to_sample, sample_sizes)):
+            samples[p] = fp
+        for group in sampled_groups:
+            by_fp: Dict[str, List[Path]] = {}
+            for p in group:
+                if samples[p] is not None:
+                    by_fp.setdefault(samples[p], []).append(p)
+            for same in by_fp.values():
+                if len(same) == 1:
+                    unique.add(same[0])
+        
+        to_hash = [p for p in candidates if not hashes[p] and p not in unique]
+        hash_sizes = [file_sizes[p] for p in to_hash]
+        if len(to_hash) < DEDUP_PROGRESS_MIN:
+            for p, h in zip(to_hash, executor.map(mp3_audio_hash, to_hash, hash_sizes)):
+                hashes[p] = h
+        else:
+            from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[bold blue]🔍 Calculando huellas de audio..."),
+                BarColumn(),
+                TextColumn("{task.completed}/{task.total}"),
+                console=console,
+                transient=True,
+            ) as progress:
+                task = progress.add_task("Huellas", total=len(to_hash))
+                # map entrega en orden desde el hilo principal: no hace falta contador compartido
+                for p, h in zip(to_hash, executor.map(mp3_audio_hash, to_hash, hash_sizes)):
+                    hashes[p] = h
+                    progress.advance(task)
+
+    for audio_size, group in by_size.items():
+        if audio_size is None:
+            continue
+        for p in group:
+            rel, key = entries[p]
+            new_cache[rel] = [key, hashes[p] or "", audio_size, samples[p] or ""]
+    if new_cache != cache:
+        _save_hash_cache(base, new_cache)
+
     by_hash: Dict[str, List[Path]] = {}
-    for p in files:
-        h = mp3_audio_hash(p)
+    for p in candidates:
+        if p in unique:
+            continue
+        h = hashes[p]
         if not h:
             h = f"NAME::{p.name.lower()}"
         by_hash.setdefault(h, []).append(p)
@@ -658,18 +1365,19 @@ def scan_duplicates(base: Path) -> Tuple[int, List[Tuple[Path, List[Path]]]]:
     duplicates: List[Tuple[Path, List[Path]]] = []
     for _, paths in by_hash.items():
         if len(paths) > 1:
-            paths_sorted = sorted(paths, key=lambda x: (x.stat().st_mtime, len(str(x))))
+            paths_sorted = sorted(paths, key=lambda x: (mtimes[x], len(str(x))))
             keep = paths_sorted[0]
             dups = paths_sorted[1:]
             duplicates.append((keep, dups))
     return (len(files), duplicates)
 
-def handle_duplicates(base: Path, move_to_folder: str = "_duplicates") -> int:
+def handle_duplicates(base: Path, move_to_folder: str = "_duplicates",
+                      mp3_entries: Optional[List[Tuple[Path, os.stat_result]]] = None) -> int:
     """Maneja duplicados con interfaz mejorada y manejo de errores."""
     
     try:
         console.print("🔍 [bold]Escaneando archivos...[/bold]")
-        total, dups = scan_duplicates(base)
+        total, dups = scan_duplicates(base, mp3_entries)
         
         if not dups:
             console.print(Panel(
@@ -715,7 +1423,11 @@ def handle_duplicates(base: Path, move_to_folder: str = "_duplicates") -> int:
         # Mover archivos con progreso
         moved = 0
         errors = 0
+        # Nombres ya ocupados en destino, leídos una vez (sin exists() por candidato)
+        with os.scandir(target) as it:
+            taken = {entry.name for entry in it}
         
+        from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
         with Progress(
             SpinnerColumn(),
             TextColumn("[bold blue]🗂️ Moviendo duplicados..."),
@@ -729,13 +1441,15 @@ def handle_duplicates(base: Path, move_to_folder: str = "_duplicates") -> int:
                 for e in extras:
                     try:
                         # Generar nombre único en destino
-                        dest = target / e.name
+                        name = e.name
                         i = 1
-                        while dest.exists():
-                            dest = target / f"{dest.stem} ({i}){dest.suffix}"
+                        while name in taken:
+                            name = f"{e.stem} ({i}){e.suffix}"
                             i += 1
+                        dest = target / name
                         
                         shutil.move(str(e), str(dest))
+                        taken.add(name)
                         moved += 1
                         progress.console.print(f"[green]✅ Movido: {e.name}[/green]")
                         
@@ -786,36 +1500,32 @@ def update_global_m3u(base_path: Path, playlist_dir: Path, playlist_title: str):
             
             # Escribir M3U global actualizado
             sorted_entries = sorted(existing_entries)
-            global_content = "\n".join(sorted_entries)
-            global_m3u.write_text(global_content, encoding='utf-8', errors='ignore')
+            global_m3u.write_bytes("\n".join(sorted_entries).encode("utf-8", "ignore"))
             
             console.print(f"[green]📝 M3U global actualizado con '{playlist_title}'[/green]")
             
     except Exception as e:
         console.print(f"[yellow]⚠️ Error actualizando M3U global: {e}[/yellow]")
 
-def create_master_m3u(base_path: Path):
+def create_master_m3u(base_path: Path, songs: Optional[Dict[str, List[str]]] = None):
     """Crea un archivo M3U maestro que incluye todas las canciones de todas las playlists."""
     try:
         master_m3u = base_path / "todas_las_canciones.m3u"
         all_songs = []
+        if songs is None:
+            songs = _playlist_songs(base_path)
         
         # Recopilar todas las canciones de todas las carpetas
-        for playlist_dir in sorted(base_path.iterdir()):
-            if playlist_dir.is_dir() and not playlist_dir.name.startswith("_"):
-                mp3_files = sorted(playlist_dir.glob("*.mp3"))
-                for mp3_file in mp3_files:
-                    # Ruta relativa desde el archivo M3U maestro
-                    relative_path = f"{playlist_dir.name}/{mp3_file.name}"
-                    all_songs.append(relative_path)
+        for folder_name, mp3_names in songs.items():
+            if folder_name.startswith("_"):
+                continue
+            # Ruta relativa desde el archivo M3U maestro
+            all_songs.extend(f"{folder_name}/{name}" for name in mp3_names)
         
         if all_songs:
-            # Crear contenido con metadatos
-            content = "#EXTM3U\n"
-            content += f"#EXTINF:-1,Todas las canciones ({len(all_songs)} tracks)\n"
-            content += "\n".join(all_songs)
-            
-            master_m3u.write_text(content, encoding='utf-8', errors='ignore')
+            # Crear contenido con metadatos en un solo join (sin copias por cada +=)
+            header = f"#EXTM3U\n#EXTINF:-1,Todas las canciones ({len(all_songs)} tracks)\n"
+            write_bytes_if_changed(master_m3u, (header + "\n".join(all_songs)).encode("utf-8", "ignore"))
             console.print(f"[green]🎵 M3U maestro creado con {len(all_songs)} canciones[/green]")
             
     except Exception as e:
@@ -826,45 +1536,51 @@ def update_all_m3u_files(base_path: Path):
     try:
         console.print("[cyan]📝 Actualizando archivos M3U...[/cyan]")
         
+        # Un solo recorrido de la biblioteca alimenta los tres tipos de M3U
+        songs = _playlist_songs(base_path)
+        
         # Actualizar M3U individual de cada playlist
-        write_all_m3u(base_path)
+        with_m3u = write_all_m3u(base_path, songs)
         
         # Crear M3U maestro con todas las canciones
-        create_master_m3u(base_path)
+        create_master_m3u(base_path, songs)
         
         # Crear M3U de índice de playlists
-        create_playlist_index_m3u(base_path)
+        create_playlist_index_m3u(base_path, songs, with_m3u)
         
         console.print("[green]✅ Todos los archivos M3U actualizados[/green]")
         
     except Exception as e:
         console.print(f"[yellow]⚠️ Error actualizando M3U: {e}[/yellow]")
 
-def create_playlist_index_m3u(base_path: Path):
-    """Crea un índice M3U que lista todas las playlists disponibles."""
+def create_playlist_index_m3u(base_path: Path, songs: Optional[Dict[str, List[str]]] = None,
+                              with_m3u: Optional[Set[str]] = None):
+    """Crea un índice M3U que lista todas las playlists disponibles.
+    
+    `with_m3u` (lo que devuelve write_all_m3u) limita el índice a las playlists cuyo
+    .m3u existe, sin volver a listar ni hacer stat de cada carpeta.
+    """
     try:
         index_m3u = base_path / "indice_playlists.m3u"
         playlists = []
+        if songs is None:
+            songs = _playlist_songs(base_path)
         
-        # Encontrar todas las carpetas de playlists
-        for playlist_dir in sorted(base_path.iterdir()):
-            if playlist_dir.is_dir() and not playlist_dir.name.startswith("_"):
-                playlist_m3u = playlist_dir / f"{playlist_dir.name}.m3u"
-                if playlist_m3u.exists():
-                    # Contar canciones en la playlist
-                    mp3_count = len(list(playlist_dir.glob("*.mp3")))
-                    if mp3_count > 0:
-                        playlists.append((playlist_dir.name, mp3_count, f"{playlist_dir.name}/{playlist_dir.name}.m3u"))
+        # Sin `with_m3u`, cada carpeta con canciones cuenta como con .m3u
+        for folder_name, mp3_names in songs.items():
+            if with_m3u is not None and folder_name not in with_m3u:
+                continue
+            if mp3_names and not folder_name.startswith("_"):
+                playlists.append((folder_name, len(mp3_names), f"{folder_name}/{folder_name}.m3u"))
         
         if playlists:
-            content = "#EXTM3U\n"
-            content += "#PLAYLIST:INDICE DE PLAYLISTS\n"
-            
+            lines = ["#EXTM3U", "#PLAYLIST:INDICE DE PLAYLISTS"]
             for playlist_name, count, path in playlists:
-                content += f"#EXTINF:-1,{playlist_name} ({count} canciones)\n"
-                content += f"{path}\n"
+                lines.append(f"#EXTINF:-1,{playlist_name} ({count} canciones)")
+                lines.append(path)
+            lines.append("")
             
-            index_m3u.write_text(content, encoding='utf-8', errors='ignore')
+            write_bytes_if_changed(index_m3u, "\n".join(lines).encode("utf-8", "ignore"))
             console.print(f"[green]📁 Índice de playlists creado con {len(playlists)} playlists[/green]")
             
     except Exception as e:
@@ -872,43 +1588,236 @@ def create_playlist_index_m3u(base_path: Path):
 
 # ---------------------- Playlists .m3u ----------------------
 
-def write_m3u_for_dir(folder: Path):
-    """Escribe un archivo M3U mejorado para una carpeta con metadatos."""
-    mp3s = sorted([p for p in folder.glob("*.mp3") if p.is_file()])
+def write_bytes_if_changed(path: Path, payload: bytes) -> bool:
+    """Escribe `payload` solo si difiere del contenido actual (evita desgaste en USB)."""
+    try:
+        # Con otro tamaño ya se sabe que cambia: no hace falta leer el archivo entero
+        if os.stat(path).st_size == len(payload) and path.read_bytes() == payload:
+            return False
+    except OSError:
+        pass
+    # Un solo write de los bytes ya codificados
+    with open(path, "wb") as f:
+        f.write(payload)
+    return True
+
+# Listados de MP3 por carpeta en esta sesión: ruta -> (mtime_ns de la carpeta, cuándo se listó, nombres).
+# El M3U de cada playlist se escribe al terminarla y otra vez en la actualización final;
+# una carpeta que no cambió entre medias no se vuelve a listar ni ordenar
+_mp3_listing_cache: Dict[str, Tuple[int, float, List[str]]] = {}
+# FAT/exFAT guardan el mtime con 2 s de resolución: un listado hecho dentro de esa ventana
+# podría no ver un archivo creado justo después con el mismo mtime, así que no se reutiliza
+_LISTING_MTIME_SLACK = 2.0
+
+def _sorted_mp3_names(folder: Union[Path, str]) -> List[str]:
+    """Nombres de los MP3 de `folder` ordenados (vacío si no se puede listar).
+    
+    Como en _iter_mp3_entries, los enlaces simbólicos no cuentan: el tipo sale del
+    dirent y ninguna entrada necesita stat. La lista devuelta puede estar compartida
+    con la caché de la sesión: no debe modificarse.
+    """
+    key = str(folder)
+    try:
+        mtime_ns = os.stat(key).st_mtime_ns
+        cached = _mp3_listing_cache.get(key)
+        if cached and cached[0] == mtime_ns and cached[1] - mtime_ns / 1e9 > _LISTING_MTIME_SLACK:
+            return cached[2]
+        listed_at = time.time()
+        with os.scandir(key) as it:
+            names = sorted(e.name for e in it if e.name.endswith(".mp3") and e.is_file(follow_symlinks=False))
+    except OSError:
+        return []
+    _mp3_listing_cache[key] = (mtime_ns, listed_at, names)
+    return names
+
+def _playlist_songs(base: Path) -> Dict[str, List[str]]:
+    """Carpeta -> MP3 ordenados de cada playlist (sin _duplicates), en un solo recorrido.
+    
+    Todo se maneja como cadenas (nombre de carpeta y de archivo): las rutas relativas
+    del M3U se forman concatenando, sin construir un Path por carpeta ni por canción.
+    """
+    with os.scandir(base) as it:
+        folders = [(e.name, e.path) for e in it
+                   if e.is_dir(follow_symlinks=False) and e.name != "_duplicates"]
+    # normcase reproduce el orden de Path (sin distinguir mayúsculas en Windows)
+    folders.sort(key=lambda f: os.path.normcase(f[0]))
+    if len(folders) <= 1:
+        return {name: _sorted_mp3_names(path) for name, path in folders}
+    # Listados independientes y limitados por E/S (USB, red): se solapan en hilos
+    workers = min(32, (os.cpu_count() or 1) * 4, len(folders))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        listings = executor.map(_sorted_mp3_names, [path for _, path in folders])
+        return {name: mp3s for (name, _), mp3s in zip(folders, listings)}
+
+def write_m3u_for_dir(folder: Path, mp3s: Optional[List[str]] = None) -> bool:
+    """Escribe un archivo M3U mejorado para una carpeta con metadatos.
+    
+    Devuelve True si el .m3u queda escrito y al día.
+    """
+    if mp3s is None:
+        mp3s = _sorted_mp3_names(folder)
     if not mp3s:
-        return
+        return False
     
     m3u_path = folder / f"{folder.name}.m3u"
     try:
         # Crear contenido M3U con metadatos
-        content = "#EXTM3U\n"
-        content += f"#PLAYLIST:{folder.name}\n"
-        
-        for mp3_file in mp3s:
+        lines = ["#EXTM3U", f"#PLAYLIST:{folder.name}"]
+        for name in mp3s:
             # Agregar metadatos básicos (duración estimada y nombre)
-            content += f"#EXTINF:-1,{mp3_file.stem}\n"
-            content += f"{mp3_file.name}\n"
+            lines.append(f"#EXTINF:-1,{name[:-4]}")
+            lines.append(name)
+        lines.append("")
         
-        m3u_path.write_text(content, encoding="utf-8", errors="ignore")
+        write_bytes_if_changed(m3u_path, "\n".join(lines).encode("utf-8", "ignore"))
+        return True
         
     except Exception as e:
         console.print(f"[yellow]No se pudo escribir {m3u_path}: {e}[/yellow]")
+        return False
 
-def write_all_m3u(base: Path):
-    """Escribe archivos M3U para todas las carpetas de playlists."""
-    for d in sorted(base.iterdir()):
-        if d.is_dir() and d.name not in {"_duplicates"}:
-            write_m3u_for_dir(d)
+def write_all_m3u(base: Path, songs: Optional[Dict[str, List[str]]] = None) -> Set[str]:
+    """Escribe archivos M3U para todas las carpetas de playlists.
+    
+    Devuelve los nombres de las carpetas cuyo .m3u quedó escrito.
+    """
+    if songs is None:
+        songs = _playlist_songs(base)
+    # Escrituras independientes y limitadas por E/S: se solapan en hilos
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        # Solo las carpetas con canciones llegan a convertirse en Path
+        pending = [(base / name, mp3s) for name, mp3s in songs.items() if mp3s]
+        results = executor.map(lambda job: write_m3u_for_dir(*job), pending)
+        return {folder.name for (folder, _), ok in zip(pending, results) if ok}
 
 # ---------------------- Utilidades ----------------------
 
 def ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
+def _playlist_dirs(base: Path, skip_private: bool = True) -> List[Path]:
+    """Subcarpetas de `base` ordenadas, usando el tipo del dirent (sin stat por entrada).
+    
+    Con `skip_private` se omiten las que empiezan por "_" (p. ej. _duplicates).
+    """
+    with os.scandir(base) as it:
+        dirs = [Path(e.path) for e in it
+                if e.is_dir(follow_symlinks=False) and not (skip_private and e.name.startswith("_"))]
+    dirs.sort()
+    return dirs
+
+# Formatos que puede producir la descarga (cfg["audio_format"])
+_AUDIO_SUFFIXES = (".mp3", ".m4a", ".opus")
+
+def _iter_mp3_entries(base: Union[Path, str], suffixes: Tuple[str, ...] = (".mp3",)) -> Iterator[os.DirEntry]:
+    """Recorre `base` recursivamente con os.scandir y produce los DirEntry de cada MP3
+    (o de cada archivo que termine en alguno de `suffixes`).
+    
+    Los enlaces simbólicos (a carpetas o a MP3) no se siguen ni se cuentan, para no
+    contar dos veces un archivo que ya está dentro del mismo árbol. Tampoco se baja a
+    carpetas ocultas (.Trashes, .Trash-1000, .Spotlight-V100 en la raíz de una USB):
+    pueden ser árboles grandes y lo que guardan no es parte de la biblioteca.
+    """
+    stack = [str(base)]
+    while stack:
+        d = stack.pop()
+        try:
+            it = os.scandir(d)
+        except OSError:
+            continue
+        with it:
+            for e in it:
+                try:
+                    if e.is_symlink():
+                        continue
+                    if e.is_dir(follow_symlinks=False):
+                        if not e.name.startswith("."):
+                            stack.append(e.path)
+                    elif e.name.endswith(suffixes):
+                        yield e
+                except OSError:
+                    continue
+
+def _collect_mp3_entries(base: Path, suffixes: Tuple[str, ...] = (".mp3",)) -> List[Tuple[Path, os.stat_result]]:
+    """Un único recorrido recursivo de `base` con el stat de cada MP3 (o de cada archivo
+    que termine en alguno de `suffixes`), para compartir entre pasos."""
+    collected: List[Tuple[Path, os.stat_result]] = []
+    for e in _iter_mp3_entries(base, suffixes):
+        try:
+            collected.append((Path(e.path), e.stat(follow_symlinks=False)))
+        except OSError:
+            pass
+    return collected
+
+def _mp3_stats(base: Union[Path, str], suffixes: Tuple[str, ...] = (".mp3",)) -> Tuple[int, int]:
+    """Cuenta los MP3 bajo `base` (recursivo) y suma su tamaño en un solo recorrido."""
+    total = 0
+    size = 0
+    for e in _iter_mp3_entries(base, suffixes):
+        try:
+            size += e.stat(follow_symlinks=False).st_size
+            total += 1
+        except OSError:
+            pass
+    return total, size
+
+def _scan_library(base: Path) -> Tuple[int, int, Dict[str, Tuple[int, int]]]:
+    """Un solo recorrido de la biblioteca: totales de audio (_AUDIO_SUFFIXES) y (archivos, bytes)
+    por carpeta de primer nivel.
+    
+    Incluye las carpetas de playlist aunque no tengan MP3. Las que empiezan por "_" o "."
+    (p. ej. _duplicates) se podan sin recorrerlas: no son playlists.
+    """
+    total = 0
+    size = 0
+    per_folder: Dict[str, Tuple[int, int]] = {}
+    folders: List[Tuple[str, str]] = []
+    with os.scandir(base) as it:
+        for e in it:
+            try:
+                if e.is_symlink():
+                    continue
+                if e.is_dir(follow_symlinks=False):
+                    if not e.name.startswith(("_", ".")):
+                        folders.append((e.name, e.path))
+                elif e.name.endswith(_AUDIO_SUFFIXES):
+                    size += e.stat(follow_symlinks=False).st_size
+                    total += 1
+            except OSError:
+                continue
+    
+    # Cada carpeta se recorre en su propio hilo: scandir/stat liberan el GIL, y en USB o
+    # unidades de red la latencia por llamada domina, así que los recorridos se solapan
+    if len(folders) > 1:
+        workers = min(32, (os.cpu_count() or 1) * 4, len(folders))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Rutas como str: scandir las acepta y no hace falta construir Path
+            results = list(executor.map(lambda d: _mp3_stats(d, _AUDIO_SUFFIXES),
+                                        [path for _, path in folders]))
+    else:
+        results = [_mp3_stats(path, _AUDIO_SUFFIXES) for _, path in folders]
+    for (name, _), (count, folder_size) in zip(folders, results):
+        per_folder[name] = (count, folder_size)
+        total += count
+        size += folder_size
+    return total, size, per_folder
+
 # ---------------------- Sistema de Progreso Mejorado ----------------------
 
-def create_enhanced_progress() -> Progress:
-    """Crea barra de progreso con más información."""
+def create_enhanced_progress(refresh_per_second: float = 4) -> Progress:
+    """Crea barra de progreso con más información.
+    
+    Con auto-refresh, update()/advance() solo cambian el estado y el hilo de Rich
+    redibuja a `refresh_per_second`; 4 Hz basta para el avance por pista.
+    """
+    from rich.progress import (
+        Progress,
+        BarColumn,
+        TextColumn,
+        TimeRemainingColumn,
+        SpinnerColumn,
+        TransferSpeedColumn,
+    )
     return Progress(
         SpinnerColumn(),
         TextColumn("[bold blue]{task.description}"),
@@ -921,15 +1830,21 @@ def create_enhanced_progress() -> Progress:
         TextColumn("•"),
         TransferSpeedColumn(),
         console=console,
-        transient=False
+        transient=False,
+        refresh_per_second=refresh_per_second,
     )
 
+# Por encima de este número de URLs el dashboard las lista como texto en lugar de tabla
+DASHBOARD_TABLE_MAX_URLS = 50
+
 def show_download_dashboard(base_path: Path, urls: List[str], cfg: Dict[str, Any]) -> None:
     """Muestra dashboard antes de iniciar descarga."""
+    from rich.columns import Columns
     
     # Verificar ffmpeg
-    ffmpeg_status = "✅ Disponible" if which_ffmpeg() else "❌ Falta"
-    ffmpeg_style = "green" if which_ffmpeg() else "red"
+    ffmpeg_found = which_ffmpeg() is not None
+    ffmpeg_status = "✅ Disponible" if ffmpeg_found else "❌ Falta"
+    ffmpeg_style = "green" if ffmpeg_found else "red"
     
     # Panel de información del sistema
     system_info = Panel(
@@ -943,34 +1858,56 @@ def show_download_dashboard(base_path: Path, urls: List[str], cfg: Dict[str, Any
         border_style="cyan"
     )
     
-    # Panel de URLs
-    url_table = Table(title="🎵 Playlists a Descargar", show_header=True, box=box.ROUNDED)
-    url_table.add_column("#", style="cyan", width=3)
-    url_table.add_column("URL", style="blue")
-    url_table.add_column("Estado", style="green", width=12)
-    
-    for i, url in enumerate(urls, 1):
-        display_url = url[:60] + "..." if len(url) > 60 else url
-        url_table.add_row(str(i), display_url, "✅ Válida")
+    # Panel de URLs: con lotes grandes una tabla mide cada celda al renderizar;
+    # un texto plano en un panel se dibuja de una vez
+    if len(urls) > DASHBOARD_TABLE_MAX_URLS:
+        url_panel = Panel(
+            "\n".join(f"[cyan]{i:>3}.[/cyan] [blue]{_ellipsize(url, 60)}[/blue]" for i, url in enumerate(urls, 1)),
+            title=f"🎵 Playlists a Descargar ({len(urls)})",
+            border_style="blue",
+        )
+    else:
+        url_panel = Table(title="🎵 Playlists a Descargar", show_header=True, box=box.ROUNDED)
+        url_panel.add_column("#", style="cyan", width=3)
+        url_panel.add_column("URL", style="blue")
+        url_panel.add_column("Estado", style="green", width=12)
+        for i, url in enumerate(urls, 1):
+            url_panel.add_row(str(i), _ellipsize(url, 60), "✅ Válida")
     
-    console.print("\n")
-    console.print(Columns([system_info, url_table]))
-    console.print("\n")
+    console.print(Group("\n", Columns([system_info, url_panel]), "\n"))
+
+# Pistas descargadas en la sesión; refresca la caché de espacio libre cada 50
+_download_counter = 0
+
+def _note_track_downloaded() -> None:
+    global _download_counter
+    _download_counter += 1
+
+@lru_cache(maxsize=8)
+def _disk_free(path_str: str, token: int) -> int:
+    return shutil.disk_usage(path_str).free
 
 def check_system_resources(base_path: Path, estimated_downloads: int) -> bool:
     """Verifica que hay suficientes recursos del sistema."""
+    # Nada que descargar (p. ej. reanudación casi terminada): ni consulta de disco ni panel
+    if estimated_downloads <= 0:
+        return True
     
     try:
-        # Verificar espacio en disco
-        free_space = shutil.disk_usage(base_path).free
+        # Verificar espacio en disco (statvfs/GetDiskFreeSpaceEx memorizado por tramos de descargas)
+        free_space = _disk_free(str(base_path), _download_counter // 50)
         estimated_size = estimated_downloads * 5 * 1024 * 1024  # 5MB promedio por canción
+        recommended_size = int(estimated_size * 1.2)  # 20% de margen
+        # Cifras en MB calculadas una vez (desplazamiento exacto para enteros positivos)
+        free_mb = free_space >> 20
+        est_mb = estimated_size >> 20
         
-        if free_space < estimated_size * 1.2:  # 20% de margen
+        if free_space < recommended_size:
             console.print(Panel(
                 f"⚠️ Espacio en disco insuficiente\n"
-                f"Disponible: [bold]{free_space // (1024**2):,} MB[/bold]\n"
-                f"Estimado necesario: [bold]{estimated_size // (1024**2):,} MB[/bold]\n"
-                f"Recomendado: [bold]{int(estimated_size * 1.2) // (1024**2):,} MB[/bold]",
+                f"Disponible: [bold]{free_mb:,} MB[/bold]\n"
+                f"Estimado necesario: [bold]{est_mb:,} MB[/bold]\n"
+                f"Recomendado: [bold]{recommended_size >> 20:,} MB[/bold]",
                 title="❌ Recursos Insuficientes",
                 border_style="red"
             ))
@@ -978,9 +1915,9 @@ def check_system_resources(base_path: Path, estimated_downloads: int) -> bool:
         
         # Mostrar información de espacio disponible
         console.print(Panel(
-            f"💾 Espacio disponible: [bold green]{free_space // (1024**2):,} MB[/bold green]\n"
-            f"📊 Espacio estimado: [bold cyan]{estimated_size // (1024**2):,} MB[/bold cyan]\n"
-            f"✅ Margen de seguridad: [bold]{((free_space - estimated_size) // (1024**2)):,} MB[/bold]",
+            f"💾 Espacio disponible: [bold green]{free_mb:,} MB[/bold green]\n"
+            f"📊 Espacio estimado: [bold cyan]{est_mb:,} MB[/bold cyan]\n"
+            f"✅ Margen de seguridad: [bold]{(free_space - estimated_size) >> 20:,} MB[/bold]",
             title="💽 Estado del Almacenamiento",
             border_style="green"
         ))
@@ -991,19 +1928,24 @@ def check_system_resources(base_path: Path, estimated_downloads: int) -> bool:
         console.print(f"[yellow]No se pudo verificar espacio en disco: {e}[/yellow]")
         return True  # Continuar si no se puede verificar
 
-def show_download_summary_enhanced(base_path: Path, downloaded: int, skipped: int, errors: int, unavailable_detected: int, start_time: float) -> None:
+def _format_elapsed(start_time: float) -> Tuple[int, int, float]:
+    """Tiempo desde `start_time` como (minutos, segundos, total en segundos)."""
+    elapsed = time.time() - start_time
+    minutes, seconds = divmod(int(elapsed), 60)
+    return minutes, seconds, elapsed
+
+def show_download_summary_enhanced(base_path: Path, downloaded: int, skipped: int, errors: int,
+                                   unavailable_detected: int, start_time: float,
+                                   totals: Optional[Tuple[int, int]] = None) -> None:
     """Muestra resumen de descarga con estadísticas completas incluyendo videos no disponibles."""
     
     try:
-        # Calcular estadísticas
-        total_files = sum(1 for _ in base_path.glob("**/*.mp3"))
-        total_size = sum(f.stat().st_size for f in base_path.glob("**/*.mp3") if f.exists())
-        total_size_mb = total_size / (1024 * 1024)
+        # Calcular estadísticas (o reutilizar las del recorrido previo)
+        total_files, total_size = totals if totals is not None else _mp3_stats(base_path, _AUDIO_SUFFIXES)
+        total_size_mb = total_size / _BYTES_PER_MB
         
         # Tiempo transcurrido
-        elapsed_time = time.time() - start_time
-        elapsed_minutes = int(elapsed_time // 60)
-        elapsed_seconds = int(elapsed_time % 60)
+        elapsed_minutes, elapsed_seconds, elapsed_time = _format_elapsed(start_time)
         
         # Panel de resultados mejorado
         results_table = Table(title="📊 Resumen de Descarga Completo", show_header=False, box=box.ROUNDED)
@@ -1014,7 +1956,7 @@ def show_download_summary_enhanced(base_path: Path, downloaded: int, skipped: in
         results_table.add_row("⏭️ Omitidos durante descarga", str(skipped))
         results_table.add_row("❌ Errores durante descarga", str(errors) if errors > 0 else "0")
         results_table.add_row("🚫 No disponibles detectados", str(unavailable_detected))
-        results_table.add_row("📁 Total archivos MP3", str(total_files))
+        results_table.add_row("📁 Total archivos de audio", str(total_files))
         results_table.add_row("💾 Tamaño total", f"{total_size_mb:.1f} MB")
         results_table.add_row("⏱️ Tiempo total", f"{elapsed_minutes}m {elapsed_seconds}s")
         
@@ -1080,29 +2022,27 @@ def show_download_summary_enhanced(base_path: Path, downloaded: int, skipped: in
     except Exception as e:
         console.print(f"[yellow]Error generando estadísticas: {e}[/yellow]")
 
-def show_download_summary(base_path: Path, downloaded: int, skipped: int, errors: int, start_time: float) -> None:
+def show_download_summary(base_path: Path, downloaded: int, skipped: int, errors: int, start_time: float,
+                          totals: Optional[Tuple[int, int]] = None) -> None:
     """Muestra resumen de descarga con estadísticas."""
     
     try:
-        # Calcular estadísticas
-        total_files = sum(1 for _ in base_path.glob("**/*.mp3"))
-        total_size = sum(f.stat().st_size for f in base_path.glob("**/*.mp3") if f.exists())
-        total_size_mb = total_size / (1024 * 1024)
+        # Calcular estadísticas (o reutilizar las del recorrido previo)
+        total_files, total_size = totals if totals is not None else _mp3_stats(base_path, _AUDIO_SUFFIXES)
+        total_size_mb = total_size / _BYTES_PER_MB
         
         # Tiempo transcurrido
-        elapsed_time = time.time() - start_time
-        elapsed_minutes = int(elapsed_time // 60)
-        elapsed_seconds = int(elapsed_time % 60)
+        elapsed_minutes, elapsed_seconds, elapsed_time = _format_elapsed(start_time)
         
         # Panel de resultados
         results_table = Table(title="📊 Resumen de Descarga", show_header=False, box=box.ROUNDED)
-        results_table.add_column("Métrica", style="cyan", width=20)
+        results_table.add_column("Métrica", style="cyan", width=25)
         results_table.add_column("Valor", style="bold green")
         
         results_table.add_row("✅ Descargados", str(downloaded))
         results_table.add_row("⏭️ Omitidos", str(skipped))
         results_table.add_row("❌ Errores", str(errors) if errors > 0 else "0")
-        results_table.add_row("📁 Total archivos", str(total_files))
+        results_table.add_row("📁 Total archivos de audio", str(total_files))
         results_table.add_row("💾 Tamaño total", f"{total_size_mb:.1f} MB")
         results_table.add_row("⏱️ Tiempo total", f"{elapsed_minutes}m {elapsed_seconds}s")
         
@@ -1137,6 +2077,56 @@ def show_download_summary(base_path: Path, downloaded: int, skipped: int, errors
 
 # ---------------------- Flujo de descarga ----------------------
 
+# Mensajes fijos de los paneles: se construyen una vez al importar el módulo
+_FFMPEG_INSTALL_MSG = "\n".join([
+    "❌ [bold]ffmpeg no encontrado[/bold]",
+    "",
+    "ffmpeg es requerido para convertir audio. Instálalo:",
+    "",
+    "🪟 Windows:",
+    "  • winget install Gyan.FFmpeg",
+    "  • choco install ffmpeg",
+    "",
+    "🍎 macOS:",
+    "  • brew install ffmpeg",
+    "",
+    "🐧 Linux:",
+    "  • sudo apt install ffmpeg (Debian/Ubuntu)",
+    "  • sudo dnf install ffmpeg (Fedora)",
+    "  • sudo pacman -S ffmpeg (Arch)",
+    "",
+    "💡 Reinicia la aplicación después de instalar ffmpeg",
+])
+
+_WELCOME_MSG = "\n".join([
+    "🎵 [bold]Descarga Interactiva de Playlists[/bold]",
+    "Pega las URLs de tus playlists de YouTube/YouTube Music",
+    "[dim]Una por línea. Finaliza con línea vacía.[/dim]",
+])
+
+_CONFIG_FINAL_MSG_FMT = "\n".join([
+    "📁 Carpeta: [bold]{output_base}[/bold]",
+    "🎵 Calidad: [bold]{audio_quality} kbps[/bold]",
+    "🎶 Formato: [bold]{audio_format}[/bold]",
+    "📝 Generar M3U: [bold]{generate_m3u}[/bold]",
+])
+
+# Opciones del asistente: tecla -> (valor, descripción), con el mapa inverso para marcar la actual
+_QUALITY_OPTIONS = {
+    "1": ("128", "Calidad estándar - archivos más pequeños (~3MB/canción)"),
+    "2": ("192", "Calidad alta - recomendado para autos (~4.5MB/canción)"),
+    "3": ("256", "Calidad muy alta - excelente sonido (~6MB/canción)"),
+    "4": ("320", "Calidad máxima - archivos más grandes (~7.5MB/canción)")
+}
+_QUALITY_CHOICE_BY_KBPS = {kbps: key for key, (kbps, _) in _QUALITY_OPTIONS.items()}
+
+_FORMAT_OPTIONS = {
+    "1": ("mp3", "MP3 - Compatible con todos los dispositivos"),
+    "2": ("m4a", "M4A/AAC - Mejor calidad, compatible con Apple"),
+    "3": ("opus", "Opus - Mejor compresión, dispositivos modernos")
+}
+_FORMAT_CHOICE_BY_NAME = {fmt: key for key, (fmt, _) in _FORMAT_OPTIONS.items()}
+
 def interactive_config_setup() -> Dict[str, Any]:
     """Configuración interactiva paso a paso con validación."""
     
@@ -1150,7 +2140,8 @@ def interactive_config_setup() -> Dict[str, Any]:
     
     # 1. Carpeta de salida con validación
     console.print("\n[bold cyan]📁 Paso 1: Carpeta de Descarga[/bold cyan]")
-    current_base = cfg.get("output_base", str(Path.cwd() / "downloads"))
+    # Se trabaja con Path de principio a fin; solo se convierte a str al guardar
+    current_base = Path(cfg.get("output_base") or Path.cwd() / "downloads").expanduser()
     
     while True:
         console.print(f"\n💡 Carpeta actual: [bold]{current_base}[/bold]")
@@ -1165,25 +2156,26 @@ def interactive_config_setup() -> Dict[str, Any]:
             new_base = current_base
             break
         elif choice == "2":  # Elegir manualmente
-            new_base = Prompt.ask("📁 Nueva carpeta base", default=current_base)
+            new_base = Path(Prompt.ask("📁 Nueva carpeta base", default=str(current_base))).expanduser()
         elif choice == "3":  # Auto-detectar USB
-            usb_base = auto_choose_output_folder(Path(current_base))
-            new_base = str(usb_base)
+            new_base = auto_choose_output_folder(current_base)
             break
         
         try:
-            path = Path(new_base).expanduser().resolve()
-            if not path.exists():
+            # EAFP: resolve(strict=True) comprueba la existencia en el mismo recorrido, sin exists() aparte
+            try:
+                path = new_base.resolve(strict=True)
+            except FileNotFoundError:
+                path = new_base.resolve()
                 if Confirm.ask(f"La carpeta no existe. ¿Crearla en {path}?", default=True):
                     path.mkdir(parents=True, exist_ok=True)
                     console.print(f"[green]✅ Carpeta creada: {path}[/green]")
+                    new_base = path
                     break
-                else:
-                    continue
-            else:
-                console.print(f"[green]✅ Carpeta válida: {path}[/green]")
-                new_base = str(path)
-                break
+                continue
+            console.print(f"[green]✅ Carpeta válida: {path}[/green]")
+            new_base = path
+            break
         except Exception as e:
             console.print(f"[red]❌ Ruta inválida: {e}[/red]")
             continue
@@ -1193,68 +2185,47 @@ def interactive_config_setup() -> Dict[str, Any]:
     console.print("[dim]2. Especificar manualmente[/dim]")
     console.print("[dim]3. Auto-detectar USB[/dim]")
     
-    cfg["output_base"] = new_base
+    cfg["output_base"] = str(new_base)
     
     # 2. Calidad de audio con explicación
     console.print("\n[bold cyan]🎵 Paso 2: Calidad de Audio[/bold cyan]")
-    quality_options = {
-        "1": ("128", "Calidad estándar - archivos más pequeños (~3MB/canción)"),
-        "2": ("192", "Calidad alta - recomendado para autos (~4.5MB/canción)"),
-        "3": ("256", "Calidad muy alta - excelente sonido (~6MB/canción)"),
-        "4": ("320", "Calidad máxima - archivos más grandes (~7.5MB/canción)")
-    }
-    
     current_quality = cfg.get("audio_quality", "192")
-    current_choice = "2"  # Default
-    for k, (q, _) in quality_options.items():
-        if q == current_quality:
-            current_choice = k
-            break
+    current_choice = _QUALITY_CHOICE_BY_KBPS.get(current_quality, "2")
     
     console.print(f"\n💡 Calidad actual: [bold]{current_quality} kbps[/bold]\n")
     
-    for key, (kbps, desc) in quality_options.items():
+    for key, (kbps, desc) in _QUALITY_OPTIONS.items():
         style = "bold green" if key == current_choice else "dim"
         marker = "➤ " if key == current_choice else "  "
         console.print(f"[{style}]{marker}{key}. {kbps} kbps - {desc}[/{style}]")
     
     quality_choice = Prompt.ask(
         "\nSelecciona calidad de audio",
-        choices=list(quality_options.keys()),
+        choices=list(_QUALITY_OPTIONS),
         default=current_choice
     )
     
-    cfg["audio_quality"] = quality_options[quality_choice][0]
+    cfg["audio_quality"] = _QUALITY_OPTIONS[quality_choice][0]
     
     # 3. Formato de audio
     console.print("\n[bold cyan]🎶 Paso 3: Formato de Audio[/bold cyan]")
-    format_options = {
-        "1": ("mp3", "MP3 - Compatible con todos los dispositivos"),
-        "2": ("m4a", "M4A/AAC - Mejor calidad, compatible con Apple"),
-        "3": ("opus", "Opus - Mejor compresión, dispositivos modernos")
-    }
-    
     current_format = cfg.get("audio_format", "mp3")
-    current_fmt_choice = "1"
-    for k, (f, _) in format_options.items():
-        if f == current_format:
-            current_fmt_choice = k
-            break
+    current_fmt_choice = _FORMAT_CHOICE_BY_NAME.get(current_format, "1")
     
     console.print(f"\n💡 Formato actual: [bold]{current_format.upper()}[/bold]\n")
     
-    for key, (fmt, desc) in format_options.items():
+    for key, (fmt, desc) in _FORMAT_OPTIONS.items():
         style = "bold green" if key == current_fmt_choice else "dim"
         marker = "➤ " if key == current_fmt_choice else "  "
         console.print(f"[{style}]{marker}{key}. {fmt.upper()} - {desc}[/{style}]")
     
     fmt_choice = Prompt.ask(
         "\nSelecciona formato de audio",
-        choices=list(format_options.keys()),
+        choices=list(_FORMAT_OPTIONS),
         default=current_fmt_choice
     )
     
-    cfg["audio_format"] = format_options[fmt_choice][0]
+    cfg["audio_format"] = _FORMAT_OPTIONS[fmt_choice][0]
     
     # 4. Opciones adicionales
     console.print("\n[bold cyan]⚙️ Paso 4: Opciones Adicionales[/bold cyan]")
@@ -1272,10 +2243,12 @@ def interactive_config_setup() -> Dict[str, Any]:
     
     # Mostrar resumen
     console.print(Panel(
-        f"📁 Carpeta: [bold]{cfg['output_base']}[/bold]\n"
-        f"🎵 Calidad: [bold]{cfg['audio_quality']} kbps[/bold]\n"
-        f"🎶 Formato: [bold]{cfg['audio_format'].upper()}[/bold]\n"
-        f"📝 Generar M3U: [bold]{'✅ Sí' if cfg['generate_m3u'] else '❌ No'}[/bold]",
+        _CONFIG_FINAL_MSG_FMT.format(
+            output_base=cfg["output_base"],
+            audio_quality=cfg["audio_quality"],
+            audio_format=cfg["audio_format"].upper(),
+            generate_m3u="✅ Sí" if cfg["generate_m3u"] else "❌ No",
+        ),
         title="📋 Configuración Final",
         border_style="green"
     ))
@@ -1284,8 +2257,8 @@ def interactive_config_setup() -> Dict[str, Any]:
 
 def check_and_offer_resume():
     """Verifica si hay una descarga pendiente y ofrece reanudarla."""
-    if should_resume_download():
-        state = load_download_state()
+    state = load_download_state()
+    if should_resume_download(state):
         playlists_info = []
         
         for playlist_id, playlist_data in state.get("playlists", {}).items():
@@ -1299,7 +2272,7 @@ def check_and_offer_resume():
                 f"🔄 [bold]Descarga pendiente detectada[/bold]\n\n"
                 f"Playlists con descargas pendientes:\n" + "\n".join(playlists_info) + "\n\n"
                 f"📁 Carpeta: {state.get('base_path', 'No especificada')}\n"
-                f"⏰ Última actualización: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(state.get('last_updated', time.time())))}",
+                f"⏰ Última actualización: {_format_state_timestamp(state)}",
                 title="🔄 Reanudar Descarga",
                 border_style="cyan"
             ))
@@ -1320,21 +2293,14 @@ def interactive_download():
     
     if resume_state:
         # Reanudar descarga existente
-        base_path = Path(resume_state["base_path"])
-        cfg = resume_state.get("config", load_config())
-        urls = [playlist_data["url"] for playlist_data in resume_state["playlists"].values()]
-        
-        console.print(f"[cyan]🔄 Reanudando {len(urls)} playlists...[/cyan]")
-        download_playlists(urls, base_path, cfg, resume_state)
+        resume_from_state(resume_state)
         return
     
     cfg = load_config()
     
     # Panel de bienvenida
     console.print(Panel(
-        "🎵 [bold]Descarga Interactiva de Playlists[/bold]\n"
-        "Pega las URLs de tus playlists de YouTube/YouTube Music\n"
-        "[dim]Una por línea. Finaliza con línea vacía.[/dim]",
+        _WELCOME_MSG,
         border_style="blue"
     ))
     
@@ -1376,18 +2342,7 @@ def interactive_download():
     # Verificación de dependencias
     if not which_ffmpeg():
         console.print(Panel(
-            "❌ [bold]ffmpeg no encontrado[/bold]\n\n"
-            "ffmpeg es requerido para convertir audio. Instálalo:\n\n"
-            "🪟 Windows:\n"
-            "  • winget install Gyan.FFmpeg\n"
-            "  • choco install ffmpeg\n\n"
-            "🍎 macOS:\n"
-            "  • brew install ffmpeg\n\n"
-            "🐧 Linux:\n"
-            "  • sudo apt install ffmpeg (Debian/Ubuntu)\n"
-            "  • sudo dnf install ffmpeg (Fedora)\n"
-            "  • sudo pacman -S ffmpeg (Arch)\n\n"
-            "💡 Reinicia la aplicación después de instalar ffmpeg",
+            _FFMPEG_INSTALL_MSG,
             title="Dependencia Requerida",
             border_style="red"
         ))
@@ -1419,11 +2374,32 @@ def interactive_download():
     # Iniciar descarga
     download_playlists(urls, selected_base, cfg)
 
-@retry_on_failure(max_retries=2, delay=1.0)  # Reducir reintentos para videos no disponibles
-def download_single_track(ydl, entry: dict, idx: int, playlist_id: str = "") -> Tuple[bool, str]:
+# Títulos que yt-dlp usa en la lectura plana para pistas que ya no existen
+UNAVAILABLE_ENTRY_TITLES = frozenset({"[Deleted video]", "[Private video]"})
+
+def _is_usable_entry(entry: Optional[dict]) -> bool:
+    """Una entrada de playlist es descargable si tiene al menos ID, título o URL."""
+    if not entry or entry.get("title") in UNAVAILABLE_ENTRY_TITLES:
+        return False
+    return bool(entry.get("id") or entry.get("title") or entry.get("url"))
+
+@retry_on_failure(max_retries=2, initial_delay=1.0,  # Reducir reintentos para videos no disponibles
+                  retry_on=(TransientDownloadError,))
+def download_single_track(ydl, entry: dict, idx: int, playlist_id: str = "",
+                          existing_stems: Optional[Set[str]] = None) -> Tuple[bool, str]:
     """Descarga una pista individual con manejo robusto de errores."""
+    import yt_dlp  # ya cargado por quien creó `ydl`; solo enlaza el nombre
     title = entry.get("title") or entry.get("id") or f"item{idx}"
     
+    # Si el archivo final ya existe en la carpeta se evita la petición de red
+    if existing_stems and entry.get("title"):
+        try:
+            expected = Path(ydl.prepare_filename({**entry, "ext": "tmp"})).stem
+            if expected in existing_stems:
+                return False, "Ya descargado"
+        except Exception:
+            pass
+    
     # Construir URL de manera más robusta
     url = None
     if entry.get("webpage_url"):
@@ -1433,7 +2409,7 @@ def download_single_track(ydl, entry: dict, idx: int, playlist_id: str = "") ->
     elif entry.get("id"):
         # Construir URL desde ID si es necesario
         video_id = entry["id"]
-        if len(video_id) == 11:  # YouTube video ID típico
+        if YT_VIDEO_ID_RE.match(video_id):  # YouTube video ID típico
             url = f"https://www.youtube.com/watch?v={video_id}"
         else:
             url = video_id
@@ -1458,30 +2434,123 @@ def download_single_track(ydl, entry: dict, idx: int, playlist_id: str = "") ->
         
     except yt_dlp.utils.DownloadError as de:
         error_msg = str(de)
-        error_lower = error_msg.lower()
-        
-        # Categorizar errores más específicamente
-        if any(keyword in error_lower for keyword in ["copyright", "copyright claim"]):
-            return False, "Copyright claim"
-        elif any(keyword in error_lower for keyword in ["unavailable", "not available", "removed"]):
-            return False, "Video no disponible"
-        elif any(keyword in error_lower for keyword in ["private", "privado"]):
-            return False, "Video privado"
-        elif any(keyword in error_lower for keyword in ["blocked", "geo", "region"]):
-            return False, "Bloqueado geográficamente"
-        elif "premium" in error_lower:
-            return False, "Requiere suscripción premium"
-        else:
-            # Error de descarga que podría resolverse con reintentos
-            last_line = error_msg.splitlines()[-1] if error_msg.splitlines() else error_msg
-            raise Exception(f"Error de descarga: {last_line[:80]}")
+        
+        # Categorizar errores más específicamente (gana la categoría de mayor prioridad)
+        found = {m.lastgroup for m in DOWNLOAD_ERROR_RE.finditer(error_msg)}
+        if found:
+            for name, _, reason in _DOWNLOAD_ERROR_CATEGORIES:
+                if name in found:
+                    return False, reason
+        
+        # Error de descarga que podría resolverse con reintentos
+        last_line = error_msg.rstrip("\n").rpartition("\n")[2] or error_msg
+        raise TransientDownloadError(f"Error de descarga: {last_line[:80]}") from de
+    
+    except OSError as e:
+        # Cortes de red y timeouts de socket también se reintentan
+        raise TransientDownloadError(f"Error de red: {str(e)[:80]}") from e
             
     except Exception as e:
-        # Otros errores que podrían resolverse con reintentos
-        raise Exception(f"Error inesperado: {str(e)[:80]}")
+        # Otros errores (fallos de programación): se informan sin reintentar
+        raise Exception(f"Error inesperado: {str(e)[:80]}") from e
+
+# Intervalo mínimo entre volcados de las líneas "✅/⏭️/❌" por pista durante la descarga
+TRACK_LOG_FLUSH_INTERVAL = 0.5
+
+# Resumen por playlist: una sola llamada a console.print (un único parseo de markup)
+PLAYLIST_SUMMARY_FMT = "\n".join([
+    "",
+    "=" * 80,
+    "[cyan]📋 PLAYLIST COMPLETADA: '{title}'[/cyan]",
+    "[green]   ✅ Descargadas: {downloaded}[/green]",
+    "[yellow]   ⏭️ Omitidas: {skipped}[/yellow]",
+    "[red]   ❌ Errores: {errors}[/red]",
+    "=" * 80,
+    "",
+])
+
+# ---------------------- Caché de metadata de playlists ----------------------
+
+# Campos que usa la descarga; el resto de la lectura plana no se guarda
+_META_INFO_KEYS = ("id", "title", "playlist_title", "playlist")
+_META_ENTRY_KEYS = ("id", "title", "url", "webpage_url", "ie_key", "extractor_key")
+
+def _playlist_key(url: str) -> str:
+    """ID corto y estable de una playlist (el mismo que usa el estado de descarga)."""
+    # BLAKE2s de 32 bits: mismo largo (8 hex) que antes, sin MD5 (rechazado en modo FIPS)
+    return hashlib.blake2s(url.encode("utf-8"), digest_size=4).hexdigest()
+
+def _legacy_playlist_key(url: str) -> str:
+    """ID con el que versiones anteriores guardaban la playlist en el estado (MD5)."""
+    try:
+        return hashlib.md5(url.encode()).hexdigest()[:8]
+    except ValueError:
+        # OpenSSL en modo FIPS: no pudo haber estados con esa clave
+        return ""
+
+def _slim_entry(entry: Any) -> Optional[Dict[str, Any]]:
+    """Reduce una entrada de la lectura plana a los campos de _META_ENTRY_KEYS."""
+    if not isinstance(entry, dict):
+        return None
+    return {k: entry[k] for k in _META_ENTRY_KEYS if entry.get(k) is not None}
 
-def download_playlists(urls: List[str], base: Path, cfg: Dict[str, Any], resume_state: Optional[Dict[str, Any]] = None) -> None:
-    """Descarga playlists con manejo mejorado de errores, progreso y capacidad de reanudar."""
+def _load_cached_playlist_info(url: str, ttl: float) -> Optional[Dict[str, Any]]:
+    path = META_CACHE_DIR / f"{_playlist_key(url)}.json"
+    try:
+        if time.time() - path.stat().st_mtime >= ttl:
+            return None
+        info = _json_loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(info, dict) or not isinstance(info.get("entries"), list):
+        return None
+    return info
+
+def _save_cached_playlist_info(url: str, info: Dict[str, Any]) -> None:
+    slim = {k: info.get(k) for k in _META_INFO_KEYS}
+    # Las entradas ya vienen reducidas por fetch_playlist_info
+    slim["entries"] = info["entries"]
+    try:
+        META_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _atomic_write_bytes(META_CACHE_DIR / f"{_playlist_key(url)}.json", _json_dumps(slim, indent=False))
+    except Exception:
+        pass
+
+def fetch_playlist_info(flat_ydl: Any, url: str, cache_ttl: float = 0) -> Optional[Dict[str, Any]]:
+    """Lectura plana de una playlist; con `cache_ttl` > 0 reutiliza la guardada en disco.
+    
+    Cada lectura correcta se guarda para que una reanudación posterior no repita las
+    peticiones de la playlist mientras la copia tenga menos de `cache_ttl` segundos.
+    """
+    if cache_ttl > 0:
+        cached = _load_cached_playlist_info(url, cache_ttl)
+        if cached is not None:
+            return cached
+    info = flat_ydl.extract_info(url, download=False)
+    if info:
+        # Con lazy_playlist las entradas llegan como iterador: se reducen al vuelo y
+        # nunca se retienen a la vez los dicts completos (miniaturas, etc.) de la lectura
+        info["entries"] = [_slim_entry(e) for e in (info.get("entries") or [])]
+        _save_cached_playlist_info(url, info)
+    return info
+
+def _write_playlist_m3u(out_dir: Path, playlist_title: str) -> None:
+    """Genera el M3U de una playlist terminada desde el hilo de post-procesado."""
+    try:
+        write_m3u_for_dir(out_dir)
+        console.print(f"[green]📝 Lista M3U generada para '{playlist_title}'[/green]")
+    except Exception as e:
+        console.print(f"[yellow]⚠️ Error generando M3U: {e}[/yellow]")
+
+def download_playlists(urls: List[str], base: Path, cfg: Dict[str, Any], resume_state: Optional[Dict[str, Any]] = None,
+                       refresh_meta: bool = False) -> None:
+    """Descarga playlists con manejo mejorado de errores, progreso y capacidad de reanudar.
+    
+    Al reanudar se reutiliza la lista de pistas guardada de cada playlist (hasta
+    cfg["meta_cache_ttl"] segundos) salvo con `refresh_meta`; una descarga nueva
+    siempre vuelve a leerlas para ver las canciones añadidas.
+    """
+    import yt_dlp
     
     # Configurar manejadores de señales para control de pausa
     setup_signal_handlers()
@@ -1518,17 +2587,68 @@ def download_playlists(urls: List[str], base: Path, cfg: Dict[str, Any], resume_
     show_download_dashboard(base, urls, cfg)
     
     # Verificar recursos del sistema
-    estimated_tracks = len(urls) * 20  # Estimación aproximada
+    if resume_state:
+        # Al reanudar se conocen las pistas pendientes; las playlists aún sin leer cuentan 20
+        estimated_tracks = 0
+        for playlist_data in download_state.get("playlists", {}).values():
+            tracks = playlist_data.get("tracks") or {}
+            if not tracks:
+                if playlist_data.get("status") != DownloadState.COMPLETED:
+                    estimated_tracks += 20
+                continue
+            estimated_tracks += sum(1 for t in tracks.values()
+                                    if t.get("status") not in (DownloadState.COMPLETED, DownloadState.SKIPPED))
+    else:
+        estimated_tracks = len(urls) * 20  # Estimación aproximada
     if not check_system_resources(base, estimated_tracks):
         if not Confirm.ask("¿Continuar de todos modos?", default=False):
             console.print("[yellow]Descarga cancelada por el usuario[/yellow]")
             return
 
-    # Progreso mejorado
-    with create_enhanced_progress() as progress:
+    # Lectura plana (una sola petición por playlist): la metadata completa de cada
+    # pista la obtiene download_single_track al descargarla. Una sola instancia para
+    # todas las playlists evita recargar extractores y sesión HTTP en cada una
+    flat_opts = {
+        "quiet": True, 
+        "logger": QuietLogger(), 
+        "noprogress": True, 
+        "no_warnings": True,
+        "ignoreerrors": True,  # Ignorar errores en videos individuales
+        "extract_flat": "in_playlist",
+        "lazy_playlist": True,  # Entradas como iterador; fetch_playlist_info las reduce al vuelo
+        "playlistend": None,  # Sin límite de videos
+        "skip_unavailable_fragments": True,
+        "extractor_retries": 3,
+        "retries": 3
+    }
+
+    # Descargas en paralelo: la latencia de red de varias pistas se solapa
+    concurrency = max(1, int(cfg.get("concurrency", DEFAULT_OPTS["concurrency"])))
+    # Con varios ffmpeg a la vez, fijarlos a núcleos distintos evita que el planificador
+    # los mueva y vacíe sus cachés (opcional: con otra carga en el equipo puede empeorar)
+    worker_init = None
+    if concurrency > 1 and cfg.get("pin_workers", DEFAULT_OPTS["pin_workers"]):
+        worker_init = _make_worker_pinner()
+
+    # Progreso mejorado. La lectura de la siguiente playlist se solapa con la descarga de
+    # la actual; con un único hilo lector flat_ydl nunca se usa desde dos hilos a la vez.
+    # post_pool escribe el M3U de cada playlist terminada mientras empieza la siguiente;
+    # al salir del with se espera a que termine, antes de la deduplicación final
+    with create_enhanced_progress() as progress, yt_dlp.YoutubeDL(flat_opts) as flat_ydl, \
+            ThreadPoolExecutor(max_workers=1) as meta_pool, \
+            ThreadPoolExecutor(max_workers=concurrency, initializer=worker_init) as executor, \
+            ThreadPoolExecutor(max_workers=1) as post_pool:
         pl_task = progress.add_task("[bold blue]📦 Procesando Playlists", total=len(urls))
+        meta_ttl = 0.0
+        if resume_state and not refresh_meta:
+            meta_ttl = float(cfg.get("meta_cache_ttl", DEFAULT_OPTS["meta_cache_ttl"]))
+        next_info = meta_pool.submit(fetch_playlist_info, flat_ydl, urls[0], meta_ttl) if urls else None
+        track_task = None
 
         for playlist_idx, u in enumerate(urls, 1):
+            info_future = next_info
+            next_info = (meta_pool.submit(fetch_playlist_info, flat_ydl, urls[playlist_idx], meta_ttl)
+                         if playlist_idx < len(urls) else None)
             # Verificar si debemos continuar
             if not download_controller.is_running():
                 console.print("[yellow]⏹️ Descarga detenida por el usuario[/yellow]")
@@ -1539,63 +2659,34 @@ def download_playlists(urls: List[str], base: Path, cfg: Dict[str, Any], resume_
             console.print(f"[dim]URL: {u}[/dim]")
             
             # Generar ID único para la playlist
-            playlist_id = hashlib.md5(u.encode()).hexdigest()[:8]
+            playlist_id = _playlist_key(u)
             
             # 1) Extraer metadata de la playlist con configuración robusta
             try:
                 progress.update(pl_task, description=f"[bold blue]📋 Leyendo playlist {playlist_idx}[/bold blue]")
                 
-                # Configuración robusta para leer playlists con errores individuales
-                robust_opts = {
-                    "quiet": True, 
-                    "logger": QuietLogger(), 
-                    "noprogress": True, 
-                    "no_warnings": True,
-                    "ignoreerrors": True,  # Ignorar errores en videos individuales
-                    "extract_flat": False,  # Necesitamos metadata completa
-                    "playlistend": None,  # Sin límite de videos
-                    "skip_unavailable_fragments": True,
-                    "extractor_retries": 3,
-                    "retries": 3
-                }
-                
-                with yt_dlp.YoutubeDL(robust_opts) as ytmp:
-                    info = ytmp.extract_info(u, download=False)
+                info = info_future.result()
                     
                 # Verificar si tenemos información válida de la playlist
                 if not info:
                     raise Exception("No se pudo obtener información de la playlist")
                     
             except Exception as e:
-                console.print(f"[red]❌ Error leyendo playlist:[/red] {e}")
-                console.print(f"[yellow]💡 Intentando método alternativo para playlist {playlist_idx}...[/yellow]")
-                
-                # Método alternativo: intentar extraer al menos algunas entradas
-                try:
-                    alt_opts = {
-                        "quiet": True,
-                        "extract_flat": True,  # Extracción básica
-                        "ignoreerrors": True,
-                        "no_warnings": True
-                    }
-                    with yt_dlp.YoutubeDL(alt_opts) as ytmp_alt:
-                        info = ytmp_alt.extract_info(u, download=False)
-                        
-                    if not info or not info.get("entries"):
-                        raise Exception("Método alternativo también falló")
-                        
-                    console.print(f"[green]✅ Método alternativo exitoso para playlist {playlist_idx}[/green]")
-                    
-                except Exception as e2:
-                    console.print(f"[red]❌ Playlist {playlist_idx} completamente inaccesible: {e2}[/red]")
-                    total_errors += 1
-                    progress.advance(pl_task)
-                    continue
+                console.print(f"[red]❌ Playlist {playlist_idx} completamente inaccesible: {e}[/red]")
+                total_errors += 1
+                progress.advance(pl_task)
+                continue
 
             # Título y carpeta de la playlist
             playlist_title = info.get("title") or info.get("playlist_title") or info.get("playlist") or info.get("id") or "Playlist"
             playlist_folder = safe_name(str(playlist_title), "Playlist")
             
+            # Un estado guardado por una versión anterior se migra a la clave nueva
+            if playlist_id not in download_state["playlists"]:
+                legacy_id = _legacy_playlist_key(u)
+                if legacy_id in download_state["playlists"]:
+                    download_state["playlists"][playlist_id] = download_state["playlists"].pop(legacy_id)
+            
             # Inicializar estado de la playlist si no existe
             if playlist_id not in download_state["playlists"]:
                 download_state["playlists"][playlist_id] = {
@@ -1620,23 +2711,11 @@ def download_playlists(urls: List[str], base: Path, cfg: Dict[str, Any], resume_
                 continue
 
             # Entradas (canciones) - filtrar entradas válidas
+            # fetch_playlist_info ya las entrega como lista de entradas reducidas
             all_entries = info.get("entries") or []
-            # Filtrar entradas válidas (que tengan al menos ID o título)
-            valid_entries = []
-            unavailable_count = 0
-            
-            for entry in all_entries:
-                if not entry:
-                    unavailable_count += 1
-                    continue
-                    
-                # Verificar si la entrada tiene información mínima necesaria
-                if entry.get("id") or entry.get("title") or entry.get("url"):
-                    valid_entries.append(entry)
-                else:
-                    unavailable_count += 1
-            
-            entries = valid_entries
+            # Una sola pasada: las no disponibles son la diferencia de longitudes
+            entries = [e for e in all_entries if _is_usable_entry(e)]
+            unavailable_count = len(all_entries) - len(entries)
             total_tracks = len(entries)
             
             if unavailable_count > 0:
@@ -1655,10 +2734,15 @@ def download_playlists(urls: List[str], base: Path, cfg: Dict[str, Any], resume_
             console.print(f"[blue]🎵 Iniciando descarga de {total_tracks} canciones...[/blue]")
 
             # Progreso por pistas
-            track_task = progress.add_task(f"🎵 {playlist_folder[:30]}", total=total_tracks)
+            # Una sola barra de pistas reutilizada: con muchas playlists no se acumulan
+            # tareas terminadas que Rich seguiría redibujando en cada refresco
+            if track_task is None:
+                track_task = progress.add_task(f"🎵 {playlist_folder[:30]}", total=total_tracks)
+            else:
+                progress.reset(track_task, total=total_tracks, description=f"🎵 {playlist_folder[:30]}")
 
             # 2) Opciones de descarga
-            ydl_opts = build_ydl_opts_for_playlist(out_dir, audio_format, audio_quality)
+            ydl_opts = build_ydl_opts_for_playlist(out_dir, audio_format, audio_quality, cfg)
 
             # 3) Descarga con manejo mejorado de errores
             playlist_downloaded = 0
@@ -1671,125 +2755,187 @@ def download_playlists(urls: List[str], base: Path, cfg: Dict[str, Any], resume_
                 playlist_state["total_tracks"] = total_tracks
                 playlist_state["status"] = DownloadState.DOWNLOADING
                 
-                # Inicializar tracks en el estado si no existen
+                # Clasificar pistas: las ya procesadas se cuentan, el resto se encola.
+                # El estado de cada pista se crea en la misma pasada si aún no existe
+                tracks_state = playlist_state["tracks"]
+                pending_tracks: List[Tuple[int, Dict[str, Any], Dict[str, Any], str]] = []
+                archived_ids = _load_archive_ids(out_dir)
+                archived_count = 0
                 for idx, entry in enumerate(entries, start=1):
                     track_id = entry.get("id") or f"track_{idx}"
-                    if track_id not in playlist_state["tracks"]:
-                        playlist_state["tracks"][track_id] = {
+                    track_state = tracks_state.get(track_id)
+                    if track_state is None:
+                        track_state = tracks_state[track_id] = {
                             "title": entry.get("title") or f"Track {idx}",
                             "url": entry.get("webpage_url") or entry.get("url") or "",
                             "status": DownloadState.PENDING,
                             "index": idx
                         }
+                    
+                    # Saltar si ya fue descargado o procesado
+                    if track_state["status"] in [DownloadState.COMPLETED, DownloadState.SKIPPED]:
+                        if track_state["status"] == DownloadState.COMPLETED:
+                            playlist_downloaded += 1
+                            total_downloaded += 1
+                        else:
+                            playlist_skipped += 1
+                            total_skipped += 1
+                        progress.advance(track_task)
+                        continue
+                    
+                    # Registrada en el archivo de descargas de una sincronización anterior
+                    if archived_ids and _archive_key(entry) in archived_ids:
+                        track_state["status"] = DownloadState.SKIPPED
+                        playlist_skipped += 1
+                        total_skipped += 1
+                        archived_count += 1
+                        progress.advance(track_task)
+                        continue
+                    
+                    title = entry.get("title") or entry.get("id") or f"Track {idx}"
+                    pending_tracks.append((idx, entry, track_state, title))
                 
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    for idx, entry in enumerate(entries, start=1):
-                        # Verificar si debemos continuar
-                        if not download_controller.is_running():
-                            console.print("[yellow]⏸️ Pausando descarga y guardando estado...[/yellow]")
-                            # Guardar estado antes de pausar
-                            download_state["total_downloaded"] = total_downloaded
-                            download_state["total_skipped"] = total_skipped
-                            download_state["total_errors"] = total_errors
-                            save_download_state(download_state)
-                            return
-                        
-                        track_id = entry.get("id") or f"track_{idx}"
-                        track_state = playlist_state["tracks"][track_id]
-                        
-                        # Saltar si ya fue descargado o procesado
-                        if track_state["status"] in [DownloadState.COMPLETED, DownloadState.SKIPPED]:
-                            if track_state["status"] == DownloadState.COMPLETED:
-                                playlist_downloaded += 1
-                                total_downloaded += 1
-                            else:
-                                playlist_skipped += 1
-                                total_skipped += 1
-                            progress.advance(track_task)
-                            continue
-                        
-                        title = entry.get("title") or entry.get("id") or f"Track {idx}"
-                        short_title = title[:40] + "..." if len(title) > 40 else title
-                        
+                if archived_count:
+                    console.print(
+                        f"[yellow]⏭️ {archived_count} pistas ya descargadas en sincronizaciones anteriores[/yellow]"
+                    )
+                
+                # Archivos ya presentes en la carpeta (nombre sin extensión), leídos una vez
+                existing_stems = _existing_stems(out_dir, f".{audio_format}")
+                
+                stopped = False
+                unsaved_tracks = 0
+                last_state_save = time.monotonic()
+                track_lines: List[str] = []
+                last_log_flush = last_state_save
+                # Instancias de YoutubeDL nuevas por playlist (carpeta y archivo de descargas
+                # propios); los hilos del pool se reutilizan entre playlists
+                # Pistas ya contadas en la clasificación (completadas, omitidas o archivadas)
+                tracks_done = total_tracks - len(pending_tracks)
+                with ThreadLocalYDL(ydl_opts) as ydl_pool:
+                    futures = {}
+                    for idx, entry, track_state, title in pending_tracks:
                         # Actualizar estado del track
                         track_state["status"] = DownloadState.DOWNLOADING
-                        
-                        # Mostrar qué canción se está procesando actualmente
-                        progress.update(track_task, description=f"🎵 Procesando: {short_title}")
-                        
-                        # Anunciar inicio de descarga con más detalle
-                        progress.console.print(f"\n[cyan]🎵 [{idx:02d}/{total_tracks:02d}] Iniciando: [bold]{title}[/bold][/cyan]")
-                        
+                        future = executor.submit(
+                            _download_track_task, ydl_pool, entry, idx, playlist_id, existing_stems
+                        )
+                        futures[future] = (idx, track_state, title)
+                    
+                    for future in as_completed(futures):
+                        idx, track_state, title = futures[future]
+                        track_label = f"[{idx:02d}/{total_tracks:02d}] {title}"
+                        if future.cancelled():
+                            track_state["status"] = DownloadState.PENDING
+                            continue
                         try:
-                            # Mostrar estado antes de descargar
-                            progress.console.print(f"[dim]   🔄 Conectando y verificando disponibilidad...[/dim]")
-                            
-                            success, message = download_single_track(ydl, entry, idx, playlist_id)
+                            outcome = future.result()
+                            if outcome is None:
+                                # Pausa/detención antes de empezar: la pista queda pendiente
+                                track_state["status"] = DownloadState.PENDING
+                                if not stopped:
+                                    stopped = True
+                                    for f in futures:
+                                        f.cancel()
+                                continue
                             
+                            success, message = outcome
+                            # Una sola línea por pista: la barra de progreso ya muestra el avance
                             if success:
-                                progress.console.print(f"[green]   ✅ DESCARGADO: {title}[/green]")
+                                track_lines.append(f"[green]   ✅ {track_label} — {message}[/green]")
                                 track_state["status"] = DownloadState.COMPLETED
                                 playlist_downloaded += 1
                                 total_downloaded += 1
+                                _note_track_downloaded()
                             else:
-                                progress.console.print(f"[yellow]   ⏭️ OMITIDO: {title}[/yellow]")
-                                progress.console.print(f"[yellow]   📝 Razón: {message}[/yellow]")
+                                track_lines.append(f"[yellow]   ⏭️ {track_label} — Omitido: {message}[/yellow]")
                                 track_state["status"] = DownloadState.SKIPPED
                                 playlist_skipped += 1
                                 total_skipped += 1
                         except Exception as e:
-                            progress.console.print(f"[red]   ❌ ERROR: {title}[/red]")
-                            progress.console.print(f"[red]   📝 Detalle: {str(e)[:80]}...[/red]")
+                            track_lines.append(f"[red]   ❌ {track_label} — Error: {str(e)[:80]}[/red]")
                             track_state["status"] = DownloadState.ERROR
                             playlist_errors += 1
                             total_errors += 1
-                        finally:
-                            # Guardar estado después de cada track
-                            playlist_state["downloaded"] = playlist_downloaded
-                            playlist_state["skipped"] = playlist_skipped
-                            playlist_state["errors"] = playlist_errors
-                            download_state["total_downloaded"] = total_downloaded
-                            download_state["total_skipped"] = total_skipped
-                            download_state["total_errors"] = total_errors
-                            save_download_state(download_state)
-                            
-                            # Actualizar barra de progreso
-                            progress.advance(track_task)
-                            # Mostrar progreso actual de la playlist
-                            completed = idx
-                            remaining = total_tracks - idx
-                            progress.console.print(f"[dim]   📊 Progreso de playlist: {completed}/{total_tracks} ({remaining} restantes)[/dim]")
+                        
+                        playlist_state["downloaded"] = playlist_downloaded
+                        playlist_state["skipped"] = playlist_skipped
+                        playlist_state["errors"] = playlist_errors
+                        download_state["total_downloaded"] = total_downloaded
+                        download_state["total_skipped"] = total_skipped
+                        download_state["total_errors"] = total_errors
+                        now = time.monotonic()
+                        # Las líneas por pista se vuelcan en bloque: un solo redibujado del Live
+                        if now - last_log_flush >= TRACK_LOG_FLUSH_INTERVAL:
+                            progress.console.print("\n".join(track_lines))
+                            track_lines.clear()
+                            last_log_flush = now
+                        # Checkpoint del estado cada STATE_SAVE_EVERY pistas o STATE_SAVE_INTERVAL segundos
+                        unsaved_tracks += 1
+                        if unsaved_tracks >= STATE_SAVE_EVERY or now - last_state_save >= STATE_SAVE_INTERVAL:
+                            save_download_state(download_state, playlist_id)
+                            unsaved_tracks = 0
+                            last_state_save = now
+                        
+                        # Actualizar barra de progreso: avance y última pista en una sola llamada,
+                        # siempre desde el hilo principal (Rich la pinta en su propio refresco)
+                        tracks_done += 1
+                        progress.update(
+                            track_task, advance=1,
+                            description=f"🎵 {tracks_done}/{total_tracks} · {_ellipsize(title, 40)}",
+                        )
+                
+                if track_lines:
+                    progress.console.print("\n".join(track_lines))
+                
+                if stopped:
+                    console.print("[yellow]⏸️ Pausando descarga y guardando estado...[/yellow]")
+                    # Guardar estado antes de pausar
+                    download_state["total_downloaded"] = total_downloaded
+                    download_state["total_skipped"] = total_skipped
+                    download_state["total_errors"] = total_errors
+                    save_download_state(download_state, playlist_id)
+                    return
                             
             except Exception as e:
                 console.print(f"[red]❌ Error crítico en playlist:[/red] {e}")
                 total_errors += 1
 
             # Resumen de la playlist con separador visual
-            console.print("\n" + "="*80)
-            console.print(f"[cyan]📋 PLAYLIST COMPLETADA: '{playlist_title}'[/cyan]")
-            console.print(f"[green]   ✅ Descargadas: {playlist_downloaded}[/green]")
-            console.print(f"[yellow]   ⏭️ Omitidas: {playlist_skipped}[/yellow]")
-            console.print(f"[red]   ❌ Errores: {playlist_errors}[/red]")
-            console.print("="*80 + "\n")
+            console.print(PLAYLIST_SUMMARY_FMT.format(
+                title=playlist_title,
+                downloaded=playlist_downloaded,
+                skipped=playlist_skipped,
+                errors=playlist_errors,
+            ))
 
             # 4) Post-procesado de la playlist
             try:
-                # Marcar playlist como completada
+                # Marcar playlist como completada (y volcar las pistas aún sin guardar)
                 playlist_state["status"] = DownloadState.COMPLETED
+                save_download_state(download_state, playlist_id)
                 
-                # Generar archivo .m3u si está habilitado
+                # Generar archivo .m3u si está habilitado (en segundo plano)
                 if cfg.get("generate_m3u", True) and playlist_downloaded > 0:
-                    write_m3u_for_dir(out_dir)
-                    console.print(f"[green]📝 Lista M3U generada para '{playlist_title}'[/green]")
+                    post_pool.submit(_write_playlist_m3u, out_dir, playlist_title)
             except Exception as e:
                 console.print(f"[yellow]⚠️ Error generando M3U: {e}[/yellow]")
 
             progress.advance(pl_task)
 
+    # Un solo recorrido de la biblioteca para deduplicación (solo MP3) y resumen (todo el audio,
+    # como en stats); mover duplicados dentro de `base` no cambia el total ni el tamaño
+    mp3_entries: Optional[List[Tuple[Path, os.stat_result]]] = None
+    try:
+        audio_entries: Optional[List[Tuple[Path, os.stat_result]]] = _collect_mp3_entries(base, _AUDIO_SUFFIXES)
+        mp3_entries = [(p, st) for p, st in audio_entries if p.name.endswith(".mp3")]
+    except Exception:
+        audio_entries = None
+    
     # Deduplicación final
     try:
         console.print("\n[cyan]🔍 Verificando duplicados...[/cyan]")
-        duplicates_moved = handle_duplicates(base)
+        duplicates_moved = handle_duplicates(base, mp3_entries=mp3_entries)
         if duplicates_moved > 0:
             console.print(f"[green]🗂️ Se movieron {duplicates_moved} archivos duplicados[/green]")
     except Exception as e:
@@ -1804,7 +2950,14 @@ def download_playlists(urls: List[str], base: Path, cfg: Dict[str, Any], resume_
             console.print(f"[yellow]⚠️ Error actualizando M3U finales: {e}[/yellow]")
 
     # Mostrar resumen final con información completa
-    show_download_summary_enhanced(base, total_downloaded, total_skipped, total_errors, total_unavailable_detected, start_time)
+    totals = None
+    if audio_entries is not None:
+        total_bytes = 0
+        for _, st in audio_entries:
+            total_bytes += st.st_size
+        totals = (len(audio_entries), total_bytes)
+    show_download_summary_enhanced(base, total_downloaded, total_skipped, total_errors, total_unavailable_detected,
+                                   start_time, totals)
     
     # Limpiar estado si la descarga se completó exitosamente
     if not download_controller.should_stop and not download_controller.paused:
@@ -1813,14 +2966,22 @@ def download_playlists(urls: List[str], base: Path, cfg: Dict[str, Any], resume_
         
         # Mostrar información sobre archivos M3U creados
         if cfg.get("generate_m3u", True) and total_downloaded > 0:
-            m3u_files = list(base.glob("*.m3u"))
-            if m3u_files:
+            # Contador en vez de lista: solo se necesita cuántos hay
+            m3u_count = 0
+            try:
+                with os.scandir(base) as it:
+                    for e in it:
+                        if e.name.endswith(".m3u"):
+                            m3u_count += 1
+            except OSError:
+                pass
+            if m3u_count:
                 console.print(Panel(
                     f"🎵 [bold]Archivos M3U creados:[/bold]\n\n"
                     f"• todas_las_canciones.m3u - Todas las canciones en un solo archivo\n"
                     f"• indice_playlists.m3u - Índice de todas las playlists\n"
                     f"• [Carpeta]/[Carpeta].m3u - M3U individual por playlist\n\n"
-                    f"📝 Total de archivos M3U: {len(m3u_files)}",
+                    f"📝 Total de archivos M3U: {m3u_count}",
                     title="🎵 Archivos M3U",
                     border_style="green"
                 ))
@@ -1835,23 +2996,30 @@ def download(
     interactive_config: bool = Option(False, "--config", help="Ejecutar configuración interactiva antes de descargar."),
     resume: bool = Option(False, "--resume", "-r", help="Reanudar descarga desde estado guardado."),
     force_new: bool = Option(False, "--force-new", help="Forzar nueva descarga (ignorar estado guardado)."),
+    jobs: Optional[int] = Option(None, "-j", "--jobs", min=1,
+                                 help="Descargas simultáneas por playlist (por defecto, la de la configuración)."),
+    refresh_meta: bool = Option(False, "--refresh-meta",
+                                help="Al reanudar, volver a leer las playlists en lugar de usar la lista guardada."),
 ):
     """Comando principal de descarga con mejoras."""
     
     try:
-        # Manejar reanudación o nueva descarga
+        # Manejar reanudación o nueva descarga (el estado se lee una sola vez)
+        saved_state = {} if force_new else load_download_state()
         if force_new:
             clear_download_state()
             console.print("[green]✅ Estado de descarga limpiado[/green]")
-        elif resume or should_resume_download():
-            resume_state = load_download_state()
+        elif resume or should_resume_download(saved_state):
+            resume_state = saved_state
             if resume_state:
                 base_path = Path(resume_state["base_path"])
-                cfg = resume_state.get("config", load_config())
-                urls = [playlist_data["url"] for playlist_data in resume_state["playlists"].values()]
+                cfg = resume_state.get("config") or load_config()
+                if jobs:
+                    cfg["concurrency"] = jobs
+                urls = _resume_urls(resume_state)
                 
                 console.print(f"[cyan]🔄 Reanudando {len(urls)} playlists desde estado guardado...[/cyan]")
-                download_playlists(urls, base_path, cfg, resume_state)
+                download_playlists(urls, base_path, cfg, resume_state, refresh_meta=refresh_meta)
                 return
             else:
                 console.print("[yellow]⚠️ No hay estado de descarga para reanudar[/yellow]")
@@ -1864,6 +3032,8 @@ def download(
         
         if no_m3u:
             cfg["generate_m3u"] = False
+        if jobs:
+            cfg["concurrency"] = jobs
 
         if not urls:
             console.print("[blue]ℹ️ No se proporcionaron URLs, iniciando modo interactivo...[/blue]")
@@ -1912,6 +3082,8 @@ def download(
             console.print(f"[red]❌ Error durante la descarga: {e}[/red]")
             raise typer.Exit(1)
             
+    except typer.Exit:
+        raise
     except KeyboardInterrupt:
         console.print("\n[yellow]⏹️ Descarga cancelada por el usuario[/yellow]")
         raise typer.Exit(0)
@@ -1942,6 +3114,8 @@ def dedup(
         else:
             console.print("[green]✅ No se encontraron duplicados o no se realizaron cambios[/green]")
             
+    except typer.Exit:
+        raise
     except KeyboardInterrupt:
         console.print("\n[yellow]⏹️ Deduplicación cancelada por el usuario[/yellow]")
         raise typer.Exit(0)
@@ -1975,7 +3149,7 @@ def config(
                 cfg["output_base"] = str(output_path)
                 changes_made = True
                 console.print(f"[green]✅ Carpeta base actualizada: {output_path}[/green]")
-            except Exception as e:
+            except (OSError, RuntimeError) as e:
                 console.print(f"[red]❌ Error con la ruta: {e}[/red]")
                 raise typer.Exit(1)
         
@@ -1986,7 +3160,7 @@ def config(
             console.print(f"[green]✅ Generación de M3U {status}[/green]")
         
         if set_quality:
-            if set_quality in ["128", "192", "256", "320"]:
+            if set_quality in _VALID_QUALITIES:
                 cfg["audio_quality"] = set_quality
                 changes_made = True
                 console.print(f"[green]✅ Calidad de audio actualizada: {set_quality} kbps[/green]")
@@ -1995,7 +3169,7 @@ def config(
                 raise typer.Exit(1)
         
         if set_format:
-            if set_format.lower() in ["mp3", "m4a", "opus"]:
+            if set_format.lower() in _VALID_FORMATS:
                 cfg["audio_format"] = set_format.lower()
                 changes_made = True
                 console.print(f"[green]✅ Formato de audio actualizado: {set_format.upper()}[/green]")
@@ -2022,13 +3196,19 @@ def config(
                 "output_base": "📁 Carpeta base",
                 "audio_format": "🎶 Formato de audio",
                 "audio_quality": "🎵 Calidad (kbps)",
-                "generate_m3u": "📝 Generar M3U"
+                "generate_m3u": "📝 Generar M3U",
+                "concurrency": "⚡ Descargas simultáneas",
+                "embed_thumbnail": "🖼️ Embeber miniatura",
+                "write_info_json": "🗂️ Guardar .info.json",
+                "write_description": "📄 Guardar descripción",
+                "meta_cache_ttl": "⏳ Caché de playlists (s)",
+                "pin_workers": "📌 Fijar descargas a núcleos"
             }
             
             for key, value in cfg.items():
                 label = config_labels.get(key, key)
                 display_value = str(value)
-                if key == "generate_m3u":
+                if key in ("generate_m3u", "embed_thumbnail", "write_info_json", "write_description", "pin_workers"):
                     display_value = "✅ Sí" if value else "❌ No"
                 elif key == "audio_format":
                     display_value = value.upper()
@@ -2041,6 +3221,9 @@ def config(
                 console.print("\n💡 [dim]Usa --interactive para configuración paso a paso[/dim]")
                 console.print("💡 [dim]Usa --help para ver todas las opciones disponibles[/dim]")
     
+    except typer.Exit:
+        # Salida limpia ya decidida arriba: no re-envolverla como error
+        raise
     except KeyboardInterrupt:
         console.print("\n[yellow]⏹️ Configuración cancelada por el usuario[/yellow]")
         raise typer.Exit(0)
@@ -2058,13 +3241,11 @@ def show_system_statistics(cfg: Dict[str, Any]) -> None:
         
         # Estadísticas de archivos
         if base_path.exists():
-            all_mp3 = list(base_path.glob("**/*.mp3"))
-            total_files = len(all_mp3)
-            total_size = sum(f.stat().st_size for f in all_mp3 if f.exists())
-            total_size_mb = total_size / (1024 * 1024)
+            total_files, total_size, per_folder = _scan_library(base_path)
+            total_size_mb = total_size / _BYTES_PER_MB
             
-            # Estadísticas por carpeta
-            folders = [d for d in base_path.iterdir() if d.is_dir() and not d.name.startswith("_")]
+            # Estadísticas por carpeta (ya calculadas en el mismo recorrido)
+            folders = sorted(per_folder.items(), key=lambda item: item[0].lower())
             
             # Panel principal
             stats_table = Table(title="📊 Estadísticas del Sistema", box=box.ROUNDED)
@@ -2072,7 +3253,7 @@ def show_system_statistics(cfg: Dict[str, Any]) -> None:
             stats_table.add_column("Valor", style="bold green")
             
             stats_table.add_row("📁 Carpeta base", str(base_path))
-            stats_table.add_row("🎵 Total archivos MP3", str(total_files))
+            stats_table.add_row("🎵 Total archivos de audio", str(total_files))
             stats_table.add_row("💾 Tamaño total", f"{total_size_mb:.1f} MB")
             stats_table.add_row("📂 Playlists", str(len(folders)))
             
@@ -2080,28 +3261,26 @@ def show_system_statistics(cfg: Dict[str, Any]) -> None:
                 avg_size = total_size_mb / total_files
                 stats_table.add_row("📏 Tamaño promedio", f"{avg_size:.1f} MB/archivo")
             
-            console.print(stats_table)
+            # Una sola llamada a console.print por pantalla
+            renderables: List[Any] = [stats_table]
             
             # Tabla de playlists
             if folders:
-                console.print("\n")
                 playlist_table = Table(title="📂 Desglose por Playlist", box=box.ROUNDED)
                 playlist_table.add_column("Playlist", style="blue")
                 playlist_table.add_column("Archivos", style="green")
                 playlist_table.add_column("Tamaño (MB)", style="yellow")
                 
-                for folder in sorted(folders, key=lambda x: x.name.lower()):
-                    folder_mp3s = list(folder.glob("*.mp3"))
-                    folder_size = sum(f.stat().st_size for f in folder_mp3s if f.exists())
-                    folder_size_mb = folder_size / (1024 * 1024)
-                    
+                for name, (folder_count, folder_size) in folders:
                     playlist_table.add_row(
-                        folder.name[:40] + "..." if len(folder.name) > 40 else folder.name,
-                        str(len(folder_mp3s)),
-                        f"{folder_size_mb:.1f}"
+                        _ellipsize(name, 40),
+                        str(folder_count),
+                        f"{folder_size / _BYTES_PER_MB:.1f}"
                     )
                 
-                console.print(playlist_table)
+                renderables += ["\n", playlist_table]
+            
+            console.print(Group(*renderables))
         else:
             console.print(Panel(
                 f"📁 La carpeta base no existe: {base_path}\n"
@@ -2136,8 +3315,6 @@ def show_about_info() -> None:
         border_style="cyan"
     )
     
-    console.print(version_info)
-    
     # Información de configuración
     cfg = load_config()
     config_panel = Panel(
@@ -2149,18 +3326,27 @@ def show_about_info() -> None:
         border_style="green"
     )
     
-    console.print("\n")
-    console.print(config_panel)
+    console.print(Group(version_info, "\n", config_panel))
 
-def show_enhanced_menu():
-    """Menú principal mejorado con iconos y mejor organización."""
-    
-    # Verificar si hay descarga para reanudar
-    resume_available = should_resume_download()
-    resume_indicator = " [bold red](Descarga pendiente)[/bold red]" if resume_available else ""
+_LOGO = """
+ __   __        _         _         _          _      
+ \\ \\ / /  ___  | |  ___  | |  __ _ | |_   ___ | |__   
+  \\ V /  / _ \\ | | / _ \\ | | / _` || __| / __|| '_ \\  
+   | |  |  __/ | || (_) || || (_| || |_ | (__ | | | | 
+   |_|   \\___| |_| \\___/ |_| \\__,_| \\__| \\___||_| |_|
+    """
+
+@lru_cache(maxsize=1)
+def _menu_banners() -> Tuple[Panel, Any, Panel]:
+    """Paneles fijos del menú (logo, subtítulo y cabecera), construidos una vez por sesión.
     
+    Perezoso en vez de constante de módulo para no importar Align al arrancar.
+    """
+    from rich.align import Align
+    logo = Panel(Align.center(_LOGO), border_style="blue", title="YT Music DL")
+    subtitle = Align.center("[bold]Descarga playlists y organiza por [green]PLAYLIST[/green][/bold]\n")
     # Logo con efectos
-    logo_panel = Panel(
+    header = Panel(
         Align.center(
             "[bold blue]🎵 YT Music Downloader 🎵[/bold blue]\n"
             "[dim]Descarga playlists organizadas por carpetas[/dim]"
@@ -2168,21 +3354,25 @@ def show_enhanced_menu():
         border_style="blue",
         padding=(1, 2)
     )
-    
-    console.print(logo_panel)
-    
-    # Menú con iconos y descripciones
-    menu_options = [
-        ("1", "🚀", f"Descargar playlists{resume_indicator}", "Descarga asistida con progreso visual"),
-        ("2", "🔧", "Verificar sistema", "Comprobar dependencias (ffmpeg, yt-dlp)"),
-        ("3", "💾", "Detectar USB", "Buscar y seleccionar unidad de almacenamiento"),
-        ("4", "⚙️", "Configuración", "Ajustar preferencias y valores por defecto"),
-        ("5", "🔍", "Duplicados", "Buscar y gestionar archivos duplicados"),
-        ("6", "📊", "Estadísticas", "Ver información de archivos descargados"),
-        ("7", "🔄", "Estado descarga", "Ver/gestionar estado de descarga"),
-        ("8", "ℹ️", "Información", "Acerca de la aplicación"),
-        ("0", "🚪", "Salir", "Cerrar la aplicación")
-    ]
+    return logo, subtitle, header
+
+# Opciones del menú: (número, icono, título, descripción)
+_MENU_OPTIONS = (
+    ("1", "🚀", "Descargar playlists", "Descarga asistida con progreso visual"),
+    ("2", "🔧", "Verificar sistema", "Comprobar dependencias (ffmpeg, yt-dlp)"),
+    ("3", "💾", "Detectar USB", "Buscar y seleccionar unidad de almacenamiento"),
+    ("4", "⚙️", "Configuración", "Ajustar preferencias y valores por defecto"),
+    ("5", "🔍", "Duplicados", "Buscar y gestionar archivos duplicados"),
+    ("6", "📊", "Estadísticas", "Ver información de archivos descargados"),
+    ("7", "🔄", "Estado descarga", "Ver/gestionar estado de descarga"),
+    ("8", "ℹ️", "Información", "Acerca de la aplicación"),
+    ("0", "🚪", "Salir", "Cerrar la aplicación"),
+)
+
+@lru_cache(maxsize=2)
+def _menu_table(resume_available: bool) -> Table:
+    """Tabla del menú principal; solo cambia el aviso de descarga pendiente en la opción 1."""
+    resume_indicator = " [bold red](Descarga pendiente)[/bold red]" if resume_available else ""
     
     table = Table(show_header=False, box=box.ROUNDED)
     table.add_column("", width=3, style="cyan")
@@ -2190,122 +3380,235 @@ def show_enhanced_menu():
     table.add_column("Opción", style="bold")
     table.add_column("Descripción", style="dim")
     
-    for num, icon, title, desc in menu_options:
+    for num, icon, title, desc in _MENU_OPTIONS:
+        if num == "1":
+            title += resume_indicator
         table.add_row(num, icon, title, desc)
+    return table
+
+def show_enhanced_menu(resume_available: Optional[bool] = None):
+    """Menú principal mejorado con iconos y mejor organización."""
+    # Verificar si hay descarga para reanudar (sin releer el estado si no cambió)
+    if resume_available is None:
+        resume_available = should_resume_download()
     
-    console.print(table)
+    logo_panel = _menu_banners()[2]
+    # Las dos variantes de la tabla se construyen una vez por sesión y se reutilizan
+    console.print(Group(logo_panel, _menu_table(resume_available)))
+
+def _action_check_system() -> None:
+    console.print(check_dependencies_panel())
+    if not which_ffmpeg():
+        console.print(Panel(
+            "Instala ffmpeg y vuelve a correr el programa.\n\n"
+            "Windows: winget install Gyan.FFmpeg  (o choco install ffmpeg)\n"
+            "macOS:   brew install ffmpeg\n"
+            "Linux:   apt/dnf/pacman según tu distro",
+            title="Cómo instalar ffmpeg",
+            border_style="red",
+        ))
+
+def _action_detect_usb() -> None:
+    base_cfg = Path(load_config().get("output_base", DEFAULT_OPTS["output_base"]))
+    chosen = auto_choose_output_folder(base_cfg)
+    console.print(Panel(f"Seleccionado: [bold]{chosen}[/bold]", border_style="green"))
+
+def _action_configure() -> None:
+    cfg = load_config()
+    new_out = Prompt.ask("Nueva carpeta base por defecto", default=cfg["output_base"])  # type: ignore
+    m3u_toggle = Prompt.ask("¿Generar .m3u por carpeta? (y/n)", choices=["y","n"], default="y")
+    cfg["output_base"], cfg["generate_m3u"] = (
+        str(Path(new_out).expanduser()),
+        True if m3u_toggle == "y" else False,
+    )
+    save_config(cfg)
+    console.print(Panel("Preferencias guardadas.", border_style="green"))
+
+def _action_duplicates() -> None:
+    cfg = load_config()
+    base_dir = Path(cfg.get("output_base", DEFAULT_OPTS["output_base"]))
+    ensure_dir(base_dir)
+    handle_duplicates(base_dir)
+
+def _action_statistics() -> None:
+    show_system_statistics(load_config())
+
+def _format_state_timestamp(state_data: Dict[str, Any]) -> str:
+    """Fecha de la última actualización del estado, o "N/A" si no se guardó."""
+    ts = state_data.get("last_updated")
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)) if ts else "N/A"
+
+def _render_state_table(state_data: Dict[str, Any]) -> Table:
+    """Tabla de resumen del estado de descarga (menú y comando `state status`)."""
+    table = Table(title="📊 Estado de Descarga", box=box.ROUNDED)
+    table.add_column("Información", style="cyan")
+    table.add_column("Valor", style="bold green")
+    
+    table.add_row("📁 Carpeta base", state_data.get("base_path", "No especificada"))
+    table.add_row("📊 Total descargados", str(state_data.get("total_downloaded", 0)))
+    table.add_row("⏭️ Total omitidos", str(state_data.get("total_skipped", 0)))
+    table.add_row("❌ Total errores", str(state_data.get("total_errors", 0)))
+    table.add_row("⏰ Última actualización", _format_state_timestamp(state_data))
+    return table
+
+def _render_playlist_status(state_data: Dict[str, Any]) -> Optional[Table]:
+    """Tabla con el estado y progreso de cada playlist; None si el estado no tiene playlists."""
+    playlists = state_data.get("playlists", {})
+    if not playlists:
+        return None
+    playlist_table = Table(title="🎵 Estado de Playlists", box=box.ROUNDED)
+    playlist_table.add_column("Playlist", style="blue")
+    playlist_table.add_column("Estado", style="green")
+    playlist_table.add_column("Progreso", style="yellow")
+    
+    # Celdas ya convertidas a str antes de pasarlas a Rich
+    rows = [
+        (
+            str(playlist_data.get("title", "Sin título"))[:40],
+            str(playlist_data.get("status", "unknown")),
+            f"{playlist_data.get('downloaded', 0)}/{playlist_data.get('total_tracks', 0)}",
+        )
+        for playlist_data in playlists.values()
+    ]
+    for row in rows:
+        playlist_table.add_row(*row)
+    return playlist_table
+
+def _render_state_screen(state_data: Dict[str, Any]) -> Group:
+    """Pantalla de estado completa: resumen y, si hay, tabla de playlists."""
+    renderables: List[Any] = [_render_state_table(state_data)]
+    playlist_table = _render_playlist_status(state_data)
+    if playlist_table is not None:
+        renderables += ["\n", playlist_table]
+    return Group(*renderables)
+
+def _action_download_state() -> None:
+    """Gestión de estado de descarga."""
+    state_data = load_download_state()
+    if not state_data:
+        console.print(Panel(
+            "✅ [bold]No hay estado de descarga activo[/bold]\n\n"
+            "No hay descargas pendientes o pausadas.",
+            title="📊 Estado de Descarga",
+            border_style="green"
+        ))
+        return
+    
+    # Mostrar opciones de gestión
+    console.print(Panel(
+        "🔄 [bold]Gestión de Estado de Descarga[/bold]\n\n"
+        "1. Ver estado detallado\n"
+        "2. Reanudar descarga\n"
+        "3. Limpiar estado",
+        title="🔄 Opciones",
+        border_style="cyan"
+    ))
+    
+    state_choice = Prompt.ask("Selecciona opción", choices=["1", "2", "3"], default="1")
+    
+    if state_choice == "1":
+        # Mostrar estado detallado
+        console.print(_render_state_screen(state_data))
+        
+    elif state_choice == "2":
+        # Reanudar descarga
+        resume_from_state(state_data)
+        
+    elif state_choice == "3":
+        # Limpiar estado
+        if Confirm.ask("¿Estás seguro de que quieres limpiar el estado?", default=False):
+            if clear_download_state():
+                console.print("[green]✅ Estado de descarga limpiado[/green]")
+            else:
+                console.print("[red]❌ Error limpiando el estado[/red]")
+
+# Opciones del menú principal; "0" (salir) no tiene acción
+MENU_ACTIONS: Dict[str, Callable[[], None]] = {
+    "1": interactive_download,
+    "2": _action_check_system,
+    "3": _action_detect_usb,
+    "4": _action_configure,
+    "5": _action_duplicates,
+    "6": _action_statistics,
+    "7": _action_download_state,
+    "8": show_about_info,
+}
+
+# Únicas opciones que pueden crear, cambiar o borrar el estado de descarga
+_STATE_CHANGING_CHOICES = frozenset({"1", "7"})
+_MENU_CHOICES = tuple(num for num, *_ in _MENU_OPTIONS)
+
+def _read_key() -> Optional[str]:
+    """Lee una tecla de la terminal sin esperar Enter; None si la terminal no lo permite o llegó al final."""
+    if os.name == "nt":
+        import msvcrt
+        key = msvcrt.getwch()
+        if key in ("\x00", "\xe0"):
+            # Teclas especiales (flechas, F1...): llegan en dos partes, se descartan
+            msvcrt.getwch()
+            return ""
+    else:
+        try:
+            import termios
+            import tty
+            fd = sys.stdin.fileno()
+            old = termios.tcgetattr(fd)
+        except (ImportError, OSError, ValueError):
+            return None
+        try:
+            # cbreak (no raw): Ctrl+C sigue generando KeyboardInterrupt
+            tty.setcbreak(fd)
+            # Lectura directa del descriptor: una secuencia de escape entera se consume de una vez
+            data = os.read(fd, 32)
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, old)
+        if not data:
+            # Fin de archivo o terminal colgada: volver a leer giraría sin parar
+            return None
+        key = data.decode("utf-8", errors="ignore")[:1]
+    if key == "\x03":
+        raise KeyboardInterrupt
+    return key
+
+def _ask_menu_choice(choices: Tuple[str, ...], default: str) -> str:
+    """Opción del menú con una sola tecla (Enter = `default`); Prompt.ask si no hay terminal."""
+    if sys.stdin.isatty():
+        console.print(
+            f"Selecciona [bold magenta]\\[{'/'.join(choices)}][/bold magenta] [bold cyan]({default})[/bold cyan]: ",
+            end="",
+        )
+        while True:
+            key = _read_key()
+            if key is None:
+                console.print()
+                break
+            if key in ("\r", "\n"):
+                key = default
+            # Las teclas no válidas se ignoran sin volver a pintar el prompt
+            if key in choices:
+                console.print(key)
+                return key
+    return Prompt.ask("Selecciona", choices=list(choices), default=default)
 
 def show_menu():
-    logo = """
- __   __        _         _         _          _      
- \\ \\ / /  ___  | |  ___  | |  __ _ | |_   ___ | |__   
-  \\ V /  / _ \\ | | / _ \\ | | / _` || __| / __|| '_ \\  
-   | |  |  __/ | || (_) || || (_| || |_ | (__ | | | | 
-   |_|   \\___| |_| \\___/ |_| \\__,_| \\__| \\___||_| |_|
-    """
-    console.print(Panel(Align.center(logo), border_style="blue", title="YT Music DL"))
-    console.print(Align.center("[bold]Descarga playlists y organiza por [green]PLAYLIST[/green][/bold]\n"))
+    logo_panel, subtitle, _ = _menu_banners()
+    console.print(Group(logo_panel, subtitle))
 
+    resume_available: Optional[bool] = None
     while True:
-        show_enhanced_menu()
-        
-        choice = Prompt.ask("Selecciona", choices=["1","2","3","4","5","6","7","8","0"], default="1")
-        if choice == "1":
-            interactive_download()
-        elif choice == "2":
-            console.print(check_dependencies_panel())
-            if not which_ffmpeg():
-                console.print(Panel(
-                    "Instala ffmpeg y vuelve a correr el programa.\n\n"
-                    "Windows: winget install Gyan.FFmpeg  (o choco install ffmpeg)\n"
-                    "macOS:   brew install ffmpeg\n"
-                    "Linux:   apt/dnf/pacman según tu distro",
-                    title="Cómo instalar ffmpeg",
-                    border_style="red",
-                ))
-        elif choice == "3":
-            base_cfg = Path(load_config().get("output_base", DEFAULT_OPTS["output_base"]))
-            chosen = auto_choose_output_folder(base_cfg)
-            console.print(Panel(f"Seleccionado: [bold]{chosen}[/bold]", border_style="green"))
-        elif choice == "4":
-            cfg = load_config()
-            new_out = Prompt.ask("Nueva carpeta base por defecto", default=cfg["output_base"])  # type: ignore
-            m3u_toggle = Prompt.ask("¿Generar .m3u por carpeta? (y/n)", choices=["y","n"], default="y")
-            cfg["output_base"], cfg["generate_m3u"] = (
-                str(Path(new_out).expanduser()),
-                True if m3u_toggle == "y" else False,
-            )
-            save_config(cfg)
-            console.print(Panel("Preferencias guardadas.", border_style="green"))
-        elif choice == "5":
-            cfg = load_config()
-            base_dir = Path(cfg.get("output_base", DEFAULT_OPTS["output_base"]))
-            ensure_dir(base_dir)
-            handle_duplicates(base_dir)
-        elif choice == "6":
-            cfg = load_config()
-            show_system_statistics(cfg)
-        elif choice == "7":
-            # Gestión de estado de descarga
-            state_data = load_download_state()
-            if not state_data:
-                console.print(Panel(
-                    "✅ [bold]No hay estado de descarga activo[/bold]\n\n"
-                    "No hay descargas pendientes o pausadas.",
-                    title="📊 Estado de Descarga",
-                    border_style="green"
-                ))
-            else:
-                # Mostrar opciones de gestión
-                console.print(Panel(
-                    "🔄 [bold]Gestión de Estado de Descarga[/bold]\n\n"
-                    "1. Ver estado detallado\n"
-                    "2. Reanudar descarga\n"
-                    "3. Limpiar estado",
-                    title="🔄 Opciones",
-                    border_style="cyan"
-                ))
-                
-                state_choice = Prompt.ask("Selecciona opción", choices=["1", "2", "3"], default="1")
-                
-                if state_choice == "1":
-                    # Mostrar estado detallado
-                    table = Table(title="📊 Estado de Descarga", box=box.ROUNDED)
-                    table.add_column("Información", style="cyan")
-                    table.add_column("Valor", style="bold green")
-                    
-                    table.add_row("📁 Carpeta base", state_data.get("base_path", "No especificada"))
-                    table.add_row("📊 Total descargados", str(state_data.get("total_downloaded", 0)))
-                    table.add_row("⏭️ Total omitidos", str(state_data.get("total_skipped", 0)))
-                    table.add_row("❌ Total errores", str(state_data.get("total_errors", 0)))
-                    table.add_row("⏰ Última actualización", 
-                                 time.strftime('%Y-%m-%d %H:%M:%S', 
-                                              time.localtime(state_data.get('last_updated', time.time()))))
-                    
-                    console.print(table)
-                    
-                elif state_choice == "2":
-                    # Reanudar descarga
-                    base_path = Path(state_data["base_path"])
-                    cfg = state_data.get("config", load_config())
-                    urls = [playlist_data["url"] for playlist_data in state_data["playlists"].values()]
-                    
-                    console.print(f"[cyan]🔄 Reanudando {len(urls)} playlists...[/cyan]")
-                    download_playlists(urls, base_path, cfg, state_data)
-                    
-                elif state_choice == "3":
-                    # Limpiar estado
-                    if Confirm.ask("¿Estás seguro de que quieres limpiar el estado?", default=False):
-                        if clear_download_state():
-                            console.print("[green]✅ Estado de descarga limpiado[/green]")
-                        else:
-                            console.print("[red]❌ Error limpiando el estado[/red]")
-                            
-        elif choice == "8":
-            show_about_info()
-        elif choice == "0":
+        if resume_available is None:
+            resume_available = should_resume_download()
+        show_enhanced_menu(resume_available)
+        
+        choice = _ask_menu_choice(_MENU_CHOICES, "1")
+        action = MENU_ACTIONS.get(choice)
+        if action is None:
             console.print("Hasta luego 👋")
             break
+        action()
+        # Tras las opciones informativas el aviso de descarga pendiente no puede cambiar
+        if choice in _STATE_CHANGING_CHOICES:
+            resume_available = None
 
 # Comando adicional para estadísticas
 @app.command(help="Muestra estadísticas del sistema y archivos descargados.")
@@ -2327,19 +3630,14 @@ def stats(
 # Comandos para manejo de estado
 @app.command(help="Gestiona el estado de descarga (pausar, reanudar, limpiar).")
 def state(
-    action: str = Argument(help="Acción: resume, clear, status"),
+    action: str = Argument(help="Acción: resume, clear, clear-archive, status"),
 ):
     """Gestiona el estado de descarga."""
     try:
         if action == "resume":
-            if should_resume_download():
-                resume_state = load_download_state()
-                base_path = Path(resume_state["base_path"])
-                cfg = resume_state.get("config", load_config())
-                urls = [playlist_data["url"] for playlist_data in resume_state["playlists"].values()]
-                
-                console.print(f"[cyan]🔄 Reanudando {len(urls)} playlists...[/cyan]")
-                download_playlists(urls, base_path, cfg, resume_state)
+            resume_state = load_download_state()
+            if should_resume_download(resume_state):
+                resume_from_state(resume_state)
             else:
                 console.print("[yellow]⚠️ No hay estado de descarga para reanudar[/yellow]")
                 
@@ -2349,50 +3647,26 @@ def state(
             else:
                 console.print("[red]❌ Error limpiando el estado[/red]")
                 
+        elif action == "clear-archive":
+            base_dir = Path(load_config().get("output_base", DEFAULT_OPTS["output_base"]))
+            removed = clear_download_archives(base_dir)
+            console.print(f"[green]✅ Archivos de descargas eliminados: {removed}[/green]")
+                
         elif action == "status":
             state_data = load_download_state()
             if not state_data:
                 console.print("[green]✅ No hay estado de descarga activo[/green]")
                 return
                 
-            # Mostrar información del estado
-            table = Table(title="📊 Estado de Descarga", box=box.ROUNDED)
-            table.add_column("Información", style="cyan")
-            table.add_column("Valor", style="bold green")
-            
-            table.add_row("📁 Carpeta base", state_data.get("base_path", "No especificada"))
-            table.add_row("📊 Total descargados", str(state_data.get("total_downloaded", 0)))
-            table.add_row("⏭️ Total omitidos", str(state_data.get("total_skipped", 0)))
-            table.add_row("❌ Total errores", str(state_data.get("total_errors", 0)))
-            table.add_row("⏰ Última actualización", 
-                         time.strftime('%Y-%m-%d %H:%M:%S', 
-                                      time.localtime(state_data.get('last_updated', time.time()))))
-            
-            console.print(table)
-            
-            # Mostrar playlists
-            playlists = state_data.get("playlists", {})
-            if playlists:
-                playlist_table = Table(title="🎵 Estado de Playlists", box=box.ROUNDED)
-                playlist_table.add_column("Playlist", style="blue")
-                playlist_table.add_column("Estado", style="green")
-                playlist_table.add_column("Progreso", style="yellow")
-                
-                for playlist_data in playlists.values():
-                    title = playlist_data.get("title", "Sin título")[:40]
-                    status = playlist_data.get("status", "unknown")
-                    total = playlist_data.get("total_tracks", 0)
-                    downloaded = playlist_data.get("downloaded", 0)
-                    
-                    playlist_table.add_row(title, status, f"{downloaded}/{total}")
-                
-                console.print("\n")
-                console.print(playlist_table)
+            # Resumen y playlists en una sola llamada a console.print
+            console.print(_render_state_screen(state_data))
                 
         else:
-            console.print("[red]❌ Acción inválida. Usa: resume, clear, status[/red]")
+            console.print("[red]❌ Acción inválida. Usa: resume, clear, clear-archive, status[/red]")
             raise typer.Exit(1)
             
+    except typer.Exit:
+        raise
     except Exception as e:
         console.print(f"[red]❌ Error en gestión de estado: {e}[/red]")
         raise typer.Exit(1)
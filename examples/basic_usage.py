@@ -14,8 +14,6 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from download_playlist import (
     validate_playlist_url,
     load_config,
-    save_config,
-    auto_choose_output_folder,
     console
 )
 
@@ -44,9 +42,9 @@ def example_configuration():
     
     # Load current configuration
     config = load_config()
-    console.print("Current configuration:")
-    for key, value in config.items():
-        console.print(f"  {key}: {value}")
+    console.print("Current configuration:\n" + "\n".join(
+        f"  {key}: {value}" for key, value in config.items()
+    ))
     
     # Create a custom configuration
     custom_config = {
@@ -56,9 +54,9 @@ def example_configuration():
         "generate_m3u": True
     }
     
-    console.print("\nCustom configuration example:")
-    for key, value in custom_config.items():
-        console.print(f"  {key}: {value}")
+    console.print("\nCustom configuration example:\n" + "\n".join(
+        f"  {key}: {value}" for key, value in custom_config.items()
+    ))
     
     # Note: This is just an example - we won't actually save it
     console.print("\n[dim]Use save_config(custom_config) to save this configuration[/dim]")
@@ -105,8 +103,8 @@ def example_cli_commands():
         "python download_playlist.py",  # Shows interactive menu
     ]
     
-    for cmd in commands:
-        console.print(f"[cyan]${cmd}[/cyan]")
+    # One console.print for the whole block: a single markup parse and flush
+    console.print("\n".join(f"[cyan]${cmd}[/cyan]" for cmd in commands))
     
     console.print("\n[yellow]💡 Tip: Run without arguments for interactive mode![/yellow]")
 
@@ -142,10 +140,12 @@ def example_error_scenarios():
         }
     ]
     
-    for scenario in scenarios:
-        console.print(f"[bold]{scenario['scenario']}:[/bold]")
-        console.print(f"  Result: {scenario['result']}")
-        console.print(f"  Behavior: {scenario['behavior']}\n")
+    console.print("\n".join(
+        f"[bold]{scenario['scenario']}:[/bold]\n"
+        f"  Result: {scenario['result']}\n"
+        f"  Behavior: {scenario['behavior']}\n"
+        for scenario in scenarios
+    ))
 
 def main():
     """Run all examples"""
@@ -6,19 +6,26 @@ Setup script for YT Music Downloader
 from setuptools import setup, find_packages
 from pathlib import Path
 
+here = Path(__file__).parent
+
+
+def read_text(name):
+    """Contents of a file next to setup.py, or "" if it is missing (one open, no stat)."""
+    try:
+        return (here / name).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return ""
+
+
 # Read README for long description
-readme_file = Path(__file__).parent / "README.md"
-long_description = readme_file.read_text(encoding="utf-8") if readme_file.exists() else ""
+long_description = read_text("README.md")
 
-# Read requirements
-requirements_file = Path(__file__).parent / "requirements.txt"
-requirements = []
-if requirements_file.exists():
-    requirements = [
-        line.strip() 
-        for line in requirements_file.read_text(encoding="utf-8").splitlines()
-        if line.strip() and not line.startswith("#")
-    ]
+# Read requirements (strip each line once; skip blanks and comments)
+requirements = [
+    line
+    for line in map(str.strip, read_text("requirements.txt").splitlines())
+    if line and not line.startswith("#")
+]
 
 setup(
     name="yt-music-downloader",
@@ -71,6 +78,10 @@ setup(
         "audio": [
             "mutagen>=1.47.0",
         ],
+        "fast": [
+            "orjson>=3.9.0",
+            "blake3>=0.3.0",
+        ],
     },
     entry_points={
         "console_scripts": [